@@ -2,27 +2,157 @@
 # Analizador Semántico para el compilador PyGFrame
 # Implementa las estructuras de datos centrales y el sistema de tipos
 
-from dataclasses import dataclass
-from typing import Optional, Any, List, Dict, Union, Tuple
+import json
+from bisect import insort
+from collections import ChainMap, Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Optional, Any, List, Dict, Union, Tuple, Iterable
 from datetime import datetime
 from sintactico import Nodo
 
-@dataclass
+try:
+    import orjson  # Serializador JSON en C (opcional)
+except ImportError:
+    orjson = None
+
+# Analizadores léxico y sintáctico para las funciones de integración.
+# Se importan una sola vez; si faltan, las funciones lo reportan como error.
+try:
+    import lexico
+    import sintactico
+    _INTEGRATION_IMPORT_ERROR = None
+except ImportError as _e:
+    lexico = sintactico = None
+    _INTEGRATION_IMPORT_ERROR = str(_e)
+
+# Tamaño del búfer de los archivos exportados: los reportes se escriben con
+# muchas llamadas pequeñas a write() que así llegan al sistema en pocos bloques
+_EXPORT_BUFFER_SIZE = 1 << 20
+
+def _floats_match_orjson(data: Any) -> bool:
+    """
+    Verifica que orjson escriba todos los flotantes de los datos igual que json
+    
+    orjson no usa la notación de repr() para exponentes (1e16 en lugar de 1e+16,
+    0.00001 en lugar de 1e-05) y escribe inf/nan como null; solo coinciden los
+    flotantes finitos que repr() muestra sin exponente (cero o entre 1e-4 y 1e16)
+    """
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, float):
+            if value and not 1e-4 <= abs(value) < 1e16:
+                return False
+    return True
+
+def _encode_json(data: Any) -> bytes:
+    """
+    Serializa datos a JSON indentado (2 espacios) codificado en UTF-8
+    Usa orjson si está disponible y recurre al módulo json estándar si no
+    lo está o si los datos no son soportados (ej. enteros de más de 64 bits
+    o flotantes que orjson escribiría distinto); el texto es siempre el de
+    json.dumps(indent=2, ensure_ascii=False)
+    """
+    if orjson is not None and _floats_match_orjson(data):
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+# Caché de instancias de TypeInfo (flyweight): una sola instancia por tipo distinto
+_TYPE_CACHE: Dict[Tuple[str, bool, Optional[int]], 'TypeInfo'] = {}
+
+# Tablas memoizadas de compatibilidad y promoción por par de tipos
+_COMPATIBILITY_CACHE: Dict[Tuple['TypeInfo', 'TypeInfo'], bool] = {}
+_PROMOTION_CACHE: Dict[Tuple['TypeInfo', 'TypeInfo'], bool] = {}
+
+@dataclass(frozen=True, eq=False, slots=True)
 class TypeInfo:
     """Representa información de tipo de datos en el análisis semántico"""
     base_type: str  # 'int', 'float', 'void', 'boolean'
     is_array: bool = False
     array_size: Optional[int] = None
+    _str: str = field(init=False, repr=False)  # Representación precalculada
+    _details: Dict[str, Any] = field(init=False, repr=False)  # Detalles para exportación (se exportan copias)
+    _hash: int = field(init=False, repr=False)  # Hash precalculado (clave de las cachés)
+    _numeric: bool = field(init=False, repr=False)  # Resultado precalculado de is_numeric()
+    
+    def __post_init__(self):
+        """Precalcula la representación en cadena, el hash y las propiedades derivadas (la instancia es inmutable)"""
+        if self.is_array:
+            if self.array_size:
+                text = f"{self.base_type}[{self.array_size}]"
+            else:
+                text = f"{self.base_type}[]"
+        else:
+            text = self.base_type
+        object.__setattr__(self, '_str', text)
+        object.__setattr__(self, '_hash', hash((self.base_type, self.is_array, self.array_size)))
+        object.__setattr__(self, '_numeric', self.base_type in ('int', 'float'))
+        object.__setattr__(self, '_details', {
+            'base_type': self.base_type,
+            'is_array': self.is_array,
+            'is_numeric': self._numeric
+        })
+    
+    @classmethod
+    def get(cls, base_type: str, is_array: bool = False, array_size: Optional[int] = None) -> 'TypeInfo':
+        """Obtiene la instancia compartida (interned) del tipo indicado"""
+        key = (base_type, is_array, array_size)
+        type_info = _TYPE_CACHE.get(key)
+        if type_info is None:
+            type_info = _TYPE_CACHE.setdefault(key, cls(base_type, is_array, array_size))
+        return type_info
+    
+    def __eq__(self, other) -> bool:
+        """Compara por identidad primero (tipos internados) y luego por valor"""
+        if self is other:
+            return True
+        if not isinstance(other, TypeInfo):
+            return NotImplemented
+        return (self.base_type == other.base_type and 
+                self.is_array == other.is_array and 
+                self.array_size == other.array_size)
+    
+    def __hash__(self) -> int:
+        return self._hash
     
     def is_numeric(self) -> bool:
         """Verifica si el tipo es numérico (int o float)"""
-        return self.base_type in ['int', 'float']
+        return self._numeric
     
     def is_compatible_with(self, other: 'TypeInfo') -> bool:
         """Verifica si este tipo es compatible con otro tipo"""
+        if self is other:
+            return True
+        
+        if not isinstance(other, TypeInfo):
+            return False
+        
+        key = (self, other)
+        result = _COMPATIBILITY_CACHE.get(key)
+        if result is None:
+            result = _COMPATIBILITY_CACHE[key] = self._compute_compatibility(other)
+        return result
+    
+    def can_promote_to(self, other: 'TypeInfo') -> bool:
+        """Verifica si este tipo puede ser promovido automáticamente al otro"""
         if not isinstance(other, TypeInfo):
             return False
         
+        key = (self, other)
+        result = _PROMOTION_CACHE.get(key)
+        if result is None:
+            result = _PROMOTION_CACHE[key] = self._compute_promotion(other)
+        return result
+    
+    def _compute_compatibility(self, other: 'TypeInfo') -> bool:
+        """Calcula la compatibilidad entre dos tipos (sin caché)"""
         # Tipos exactamente iguales
         if (self.base_type == other.base_type and 
             self.is_array == other.is_array and 
@@ -36,11 +166,8 @@ class TypeInfo:
         
         return False
     
-    def can_promote_to(self, other: 'TypeInfo') -> bool:
-        """Verifica si este tipo puede ser promovido automáticamente al otro"""
-        if not isinstance(other, TypeInfo):
-            return False
-        
+    def _compute_promotion(self, other: 'TypeInfo') -> bool:
+        """Calcula si el tipo puede promoverse al otro (sin caché)"""
         # int puede ser promovido a float
         if (self.base_type == 'int' and other.base_type == 'float' and 
             not self.is_array and not other.is_array):
@@ -50,14 +177,9 @@ class TypeInfo:
     
     def __str__(self) -> str:
         """Representación en cadena del tipo"""
-        if self.is_array:
-            if self.array_size:
-                return f"{self.base_type}[{self.array_size}]"
-            else:
-                return f"{self.base_type}[]"
-        return self.base_type
+        return self._str
 
-@dataclass
+@dataclass(slots=True)
 class SymbolEntry:
     """Representa una entrada en la tabla de símbolos"""
     name: str
@@ -72,7 +194,7 @@ class SymbolEntry:
         """Representación en cadena de la entrada del símbolo"""
         return f"{self.name}: {self.type_info} (scope: {self.scope}, lines: {self.lines})"
 
-@dataclass
+@dataclass(slots=True)
 class SemanticError:
     """Representa un error semántico detectado durante el análisis"""
     error_type: str
@@ -80,16 +202,81 @@ class SemanticError:
     line: int
     column: int
     severity: str = 'error'  # 'error', 'warning'
+    symbol_name: Optional[str] = None  # Variable involucrada, si el error se refiere a una
     
     def __str__(self) -> str:
         """Representación en cadena del error semántico"""
         return f"[{self.severity.upper()}] {self.error_type} at line {self.line}, column {self.column}: {self.message}"
 
+# Operadores por categoría (conjuntos para pruebas de pertenencia en O(1))
+_ARITHMETIC_OPERATORS = frozenset({'+', '-', '*', '/', '%', '^'})
+_RELATIONAL_OPERATORS = frozenset({'>', '<', '>=', '<=', '==', '!='})
+_LOGICAL_OPERATORS = frozenset({'&&', '||'})
+_UNARY_ARITHMETIC_OPERATORS = frozenset({'+', '-'})
+_NO_OPERATORS = frozenset()
+
+# Nodos contenedores que sólo envuelven a una expresión
+_CONTAINER_NODE_TYPES = frozenset({
+    'SENT_EXPRESION', 'COMPONENTE', 'EXPRESION_SIMPLE', 'FACTOR_SIMPLE',
+    'TERMINO_SIMPLE', 'SALIDA', 'LISTA_SENTENCIAS', 'IDENTIFICADOR'
+})
+
+# Envoltorios que se atraviesan para llegar al destino de una asignación
+_ASSIGNMENT_TARGET_WRAPPERS = frozenset({'COMPONENTE', 'EXPRESION_SIMPLE', 'SENT_EXPRESION'})
+
+# Tipos de nodo que representan expresiones con tipo inferible
+_EXPRESSION_NODE_TYPES = frozenset({'NUM_INT', 'NUM_FLOAT', 'BOOLEANO', 'ID', '='}) | (
+    _ARITHMETIC_OPERATORS | _RELATIONAL_OPERATORS | _LOGICAL_OPERATORS
+)
+
+# Grafías habituales de los literales booleanos (evitan llamar a lower())
+_BOOLEAN_LITERALS = {
+    'true': True, 'True': True, 'TRUE': True,
+    'false': False, 'False': False, 'FALSE': False
+}
+
+def _parse_boolean_literal(valor: str) -> bool:
+    """Convierte el texto de un literal booleano a su valor"""
+    value = _BOOLEAN_LITERALS.get(valor)
+    if value is None:
+        value = valor.lower() == 'true'
+    return value
+
+# Conversión de literales por tipo de nodo
+_LITERAL_PARSERS = {
+    'NUM_INT': int,
+    'NUM_FLOAT': float,
+    'TRUE': _parse_boolean_literal,
+    'FALSE': _parse_boolean_literal,
+}
+
+# Tipos de nodo que reciben alguna anotación; el resto (programa, listas de
+# declaraciones, bloques, sentencias) sólo se recorre para llegar a sus hijos
+_ANNOTATABLE_NODE_TYPES = _EXPRESSION_NODE_TYPES | frozenset(_LITERAL_PARSERS)
+
+# Propiedades exportadas por combinación de (is_lvalue, is_constant); los
+# diccionarios se comparten entre nodos y to_annotated_dict() entrega copias
+_NODE_PROPERTIES = {
+    (True, False): {'is_lvalue': True},
+    (False, True): {'is_constant': True},
+    (True, True): {'is_lvalue': True, 'is_constant': True},
+}
+
 class AnnotatedASTNode(Nodo):
     """Extiende la clase Nodo para incluir atributos semánticos"""
     
-    def __init__(self, original_node: Nodo):
-        """Inicializa un nodo anotado basado en un nodo original del AST"""
+    __slots__ = ('semantic_type', 'semantic_value', 'symbol_ref', 'is_lvalue', 'is_constant',
+                 '_has_info', '_children_annotated')
+    
+    def __init__(self, original_node: Nodo, children: Optional[List[Nodo]] = None):
+        """
+        Inicializa un nodo anotado basado en un nodo original del AST
+        
+        Args:
+            original_node: Nodo original del AST
+            children: Hijos ya construidos para este nodo; si se omite se
+                      copian los hijos del nodo original
+        """
         super().__init__(
             tipo=original_node.tipo,
             valor=original_node.valor,
@@ -97,8 +284,14 @@ class AnnotatedASTNode(Nodo):
             columna=original_node.columna
         )
         
-        # Copiar hijos del nodo original
-        for hijo in original_node.hijos:
+        if children is None:
+            # Copiar hijos del nodo original
+            children = original_node.hijos
+        
+        # Indica si todos los hijos son nodos anotados; agregar_hijo lo
+        # desactiva al recibir un nodo regular
+        self._children_annotated = True
+        for hijo in children:
             self.agregar_hijo(hijo)
         
         # Copiar referencia al padre si existe
@@ -108,22 +301,47 @@ class AnnotatedASTNode(Nodo):
         self.semantic_type: Optional[TypeInfo] = None
         self.semantic_value: Optional[Any] = None
         self.symbol_ref: Optional[SymbolEntry] = None
+        self._has_info: bool = False  # Se mantiene actualizado desde los setters
         
         # Atributos adicionales para análisis semántico
         self.is_lvalue: bool = False  # Indica si puede ser lado izquierdo de asignación
         self.is_constant: bool = False  # Indica si es una constante
         
+    def agregar_hijo(self, hijo):
+        """Agrega un hijo al nodo, registrando si es un nodo regular"""
+        if hijo and not isinstance(hijo, AnnotatedASTNode):
+            self._children_annotated = False
+        super().agregar_hijo(hijo)
+    
+    def annotated_children(self) -> List['AnnotatedASTNode']:
+        """Retorna los hijos que son nodos anotados, sin filtrar si todos lo son"""
+        if self._children_annotated:
+            return self.hijos
+        return [hijo for hijo in self.hijos if isinstance(hijo, AnnotatedASTNode)]
+    
     def set_semantic_type(self, type_info: TypeInfo):
         """Establece el tipo semántico del nodo"""
         self.semantic_type = type_info
+        self._refresh_has_info(type_info)
     
     def set_semantic_value(self, value: Any):
         """Establece el valor semántico del nodo"""
         self.semantic_value = value
+        self._refresh_has_info(value)
     
     def set_symbol_reference(self, symbol_entry: SymbolEntry):
         """Establece la referencia al símbolo en la tabla de símbolos"""
         self.symbol_ref = symbol_entry
+        self._refresh_has_info(symbol_entry)
+    
+    def _refresh_has_info(self, new_value: Any):
+        """Actualiza la bandera de información semántica tras asignar un atributo"""
+        if new_value is not None:
+            self._has_info = True
+        else:
+            self._has_info = (self.semantic_type is not None or 
+                              self.semantic_value is not None or 
+                              self.symbol_ref is not None)
     
     def get_semantic_type(self) -> Optional[TypeInfo]:
         """Obtiene el tipo semántico del nodo"""
@@ -139,9 +357,7 @@ class AnnotatedASTNode(Nodo):
     
     def has_semantic_info(self) -> bool:
         """Verifica si el nodo tiene información semántica"""
-        return (self.semantic_type is not None or 
-                self.semantic_value is not None or 
-                self.symbol_ref is not None)
+        return self._has_info
     
     def to_dict(self):
         """Convierte el nodo anotado a diccionario incluyendo información semántica"""
@@ -174,6 +390,24 @@ class AnnotatedASTNode(Nodo):
         """Crea un nodo anotado a partir de un nodo regular del AST"""
         return cls(node)
     
+    @classmethod
+    def wrap_tree(cls, node: Nodo) -> 'AnnotatedASTNode':
+        """
+        Construye el árbol anotado completo a partir de un nodo regular,
+        creando primero los hijos anotados y después el nodo padre
+        
+        Args:
+            node: Nodo raíz del subárbol original
+            
+        Returns:
+            Nodo anotado con todos sus descendientes anotados
+        """
+        annotated_children = [
+            hijo if isinstance(hijo, AnnotatedASTNode) else cls.wrap_tree(hijo)
+            for hijo in node.hijos
+        ]
+        return cls(node, annotated_children)
+    
     def annotate_children(self):
         """Convierte todos los hijos a nodos anotados recursivamente"""
         annotated_children = []
@@ -186,6 +420,7 @@ class AnnotatedASTNode(Nodo):
                 annotated_children.append(annotated_child)
         
         self.hijos = annotated_children
+        self._children_annotated = True
         
         # Actualizar referencias padre
         for hijo in self.hijos:
@@ -193,48 +428,61 @@ class AnnotatedASTNode(Nodo):
     
     def annotate_with_type_info(self, type_system: 'TypeSystem', symbol_table: 'SymbolTable'):
         """
-        Anota el nodo con información de tipo usando el sistema de tipos
+        Anota el nodo y sus descendientes con información de tipo, referencias
+        de símbolos y valores constantes, de las hojas hacia la raíz
         
         Args:
             type_system: Sistema de tipos para inferir tipos
             symbol_table: Tabla de símbolos para resolver identificadores
         """
-        # Anotar tipo para expresiones
-        if self.tipo in ['NUM_INT', 'NUM_FLOAT', 'BOOLEANO', 'ID', '+', '-', '*', '/', '%', '^', 
-                        '>', '<', '>=', '<=', '==', '!=', '&&', '||', '=']:
-            inferred_type = type_system.infer_expression_type(self, symbol_table)
-            if inferred_type:
-                self.set_semantic_type(inferred_type)
-        
-        # Anotar referencia de símbolo para identificadores
-        if self.tipo == 'ID':
-            symbol = symbol_table.lookup_variable(self.valor)
-            if symbol:
-                self.set_symbol_reference(symbol)
-                # Marcar como lvalue si es una variable declarada
-                self.is_lvalue = True
-        
-        # Anotar valores constantes
-        if self.tipo == 'NUM_INT':
-            try:
-                self.set_semantic_value(int(self.valor))
-                self.is_constant = True
-            except ValueError:
-                pass
-        elif self.tipo == 'NUM_FLOAT':
-            try:
-                self.set_semantic_value(float(self.valor))
-                self.is_constant = True
-            except ValueError:
-                pass
-        elif self.tipo in ['TRUE', 'FALSE']:
-            self.set_semantic_value(self.valor.lower() == 'true')
-            self.is_constant = True
-        
-        # Anotar recursivamente los hijos
-        for hijo in self.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                hijo.annotate_with_type_info(type_system, symbol_table)
+        # Enlazar localmente lo que se consulta en cada iteración
+        infer_expression_type = type_system.infer_expression_type
+        lookup_variable = symbol_table.lookup_variable
+        expression_node_types = _EXPRESSION_NODE_TYPES
+        literal_parsers = _LITERAL_PARSERS
+        annotatable_node_types = _ANNOTATABLE_NODE_TYPES
+        
+        # Recolectar los nodos en preorden con pila explícita
+        preorder = []
+        pending = [self]
+        while pending:
+            node = pending.pop()
+            preorder.append(node)
+            pending.extend(reversed(node.annotated_children()))
+        
+        # Anotar en orden inverso: cada hijo queda tipado antes que su padre, así
+        # infer_expression_type reutiliza el semantic_type de los operandos en
+        # lugar de volver a inferir todo el subárbol
+        for node in reversed(preorder):
+            tipo = node.tipo
+            
+            # Los nodos estructurales no llevan anotaciones
+            if tipo in annotatable_node_types:
+                # Anotar tipo para expresiones
+                if tipo in expression_node_types:
+                    inferred_type = infer_expression_type(node, symbol_table)
+                    if inferred_type:
+                        node.semantic_type = inferred_type
+                        node._has_info = True
+                    
+                    # Anotar referencia de símbolo para identificadores
+                    if tipo == 'ID':
+                        symbol = lookup_variable(node.valor)
+                        if symbol:
+                            node.symbol_ref = symbol
+                            node._has_info = True
+                            # Marcar como lvalue si es una variable declarada
+                            node.is_lvalue = True
+                
+                # Anotar valores constantes
+                literal_parser = literal_parsers.get(tipo)
+                if literal_parser is not None:
+                    try:
+                        node.semantic_value = literal_parser(node.valor)
+                        node._has_info = True
+                        node.is_constant = True
+                    except ValueError:
+                        pass
     
     def annotate_with_symbol_references(self, symbol_table: 'SymbolTable'):
         """
@@ -244,7 +492,8 @@ class AnnotatedASTNode(Nodo):
             symbol_table: Tabla de símbolos para resolver identificadores
         """
         # Anotar identificadores con sus símbolos correspondientes
-        if self.tipo == 'ID':
+        # (si la pasada de tipos ya resolvió el símbolo, no repetir la búsqueda)
+        if self.tipo == 'ID' and self.symbol_ref is None:
             symbol = symbol_table.lookup_variable(self.valor)
             if symbol:
                 self.set_symbol_reference(symbol)
@@ -255,9 +504,8 @@ class AnnotatedASTNode(Nodo):
                     pass
         
         # Procesar hijos recursivamente
-        for hijo in self.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                hijo.annotate_with_symbol_references(symbol_table)
+        for hijo in self.annotated_children():
+            hijo.annotate_with_symbol_references(symbol_table)
     
     def get_annotation_summary(self) -> Dict[str, Any]:
         """
@@ -312,16 +560,43 @@ class AnnotatedASTNode(Nodo):
             'hijos': []
         }
         
-        # Agregar información semántica si existe
+        # Agregar información semántica al diccionario si existe
+        semantic_info = self._semantic_attributes()
+        if semantic_info:
+            base_dict['semantic_attributes'] = semantic_info
+        
+        # Procesar hijos recursivamente
+        if self._children_annotated:
+            base_dict['hijos'] = [hijo.to_annotated_dict() for hijo in self.hijos]
+        else:
+            for hijo in self.hijos:
+                if isinstance(hijo, AnnotatedASTNode):
+                    base_dict['hijos'].append(hijo.to_annotated_dict())
+                else:
+                    # Convertir nodo regular a diccionario básico
+                    base_dict['hijos'].append(hijo.to_dict())
+        
+        return base_dict
+    
+    def _semantic_attributes(self, shared: bool = False) -> Dict[str, Any]:
+        """
+        Construye la sección 'semantic_attributes' de la exportación del nodo
+        
+        Args:
+            shared: Si es True, incluye los diccionarios compartidos de detalles
+                    de tipo y propiedades sin copiarlos; sólo para uso interno
+                    cuando el resultado no se entrega al llamador
+        
+        Returns:
+            Diccionario con la información semántica (vacío si el nodo no tiene)
+        """
         semantic_info = {}
         
         if self.semantic_type:
             semantic_info['type'] = str(self.semantic_type)
-            semantic_info['type_details'] = {
-                'base_type': self.semantic_type.base_type,
-                'is_array': self.semantic_type.is_array,
-                'is_numeric': self.semantic_type.is_numeric()
-            }
+            # Diccionario compartido por todos los nodos del mismo tipo
+            type_details = self.semantic_type._details
+            semantic_info['type_details'] = type_details if shared else dict(type_details)
         
         if self.semantic_value is not None:
             semantic_info['value'] = self.semantic_value
@@ -337,31 +612,67 @@ class AnnotatedASTNode(Nodo):
                 'memory_address': self.symbol_ref.memory_address,
                 'is_initialized': self.symbol_ref.is_initialized
             }
-
-        
-        # Agregar propiedades adicionales
-        properties = {}
-        if self.is_lvalue:
-            properties['is_lvalue'] = True
-        if self.is_constant:
-            properties['is_constant'] = True
         
+        # Agregar propiedades adicionales (diccionario compartido por combinación)
+        properties = _NODE_PROPERTIES.get((self.is_lvalue, self.is_constant))
         if properties:
-            semantic_info['properties'] = properties
-        
-        # Agregar información semántica al diccionario si existe
-        if semantic_info:
-            base_dict['semantic_attributes'] = semantic_info
+            semantic_info['properties'] = properties if shared else dict(properties)
         
-        # Procesar hijos recursivamente
-        for hijo in self.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                base_dict['hijos'].append(hijo.to_annotated_dict())
-            else:
-                # Convertir nodo regular a diccionario básico
-                base_dict['hijos'].append(hijo.to_dict())
+        return semantic_info
+    
+    def write_annotated_json(self, write, indent: int = 0):
+        """
+        Emite el JSON de to_annotated_dict() (indentado a 2 espacios) fragmento a
+        fragmento, sin construir el árbol de diccionarios completo en memoria
         
-        return base_dict
+        Args:
+            write: Función que recibe cada fragmento de texto (ej. list.append o file.write)
+            indent: Nivel de indentación del nodo raíz
+        """
+        dumps = json.dumps
+        # Pila de nodos pendientes y de fragmentos de cierre (nodo None)
+        pending = [(self, indent, None)]
+        while pending:
+            node, level, fragment = pending.pop()
+            if node is None:
+                write(fragment)
+                continue
+            
+            if not isinstance(node, AnnotatedASTNode):
+                # Nodo regular: diccionario básico reindentado a su nivel
+                write(dumps(node.to_dict(), indent=2, ensure_ascii=False).replace("\n", "\n" + "  " * level))
+                continue
+            
+            pad = "  " * (level + 1)
+            valor = node.semantic_value if node.semantic_value is not None else node.valor
+            write(
+                f'{{\n{pad}"tipo": {dumps(node.tipo, ensure_ascii=False)},'
+                f'\n{pad}"valor": {dumps(valor, ensure_ascii=False)},'
+                f'\n{pad}"linea": {dumps(node.linea)},'
+                f'\n{pad}"columna": {dumps(node.columna)},'
+                f'\n{pad}"hijos": '
+            )
+            
+            closing = ""
+            # Se serializa de inmediato: los diccionarios compartidos no se exponen
+            semantic_info = node._semantic_attributes(shared=True)
+            if semantic_info:
+                info_json = dumps(semantic_info, indent=2, ensure_ascii=False).replace("\n", "\n" + pad)
+                closing = f',\n{pad}"semantic_attributes": {info_json}'
+            closing += "\n" + "  " * level + "}"
+            
+            hijos = node.hijos
+            if not hijos:
+                write("[]" + closing)
+                continue
+            
+            # Hijos en orden inverso (la pila respeta el preorden), separados por comas
+            child_pad = pad + "  "
+            child_level = level + 2
+            pending.append((None, 0, f"\n{pad}]" + closing))
+            for position in range(len(hijos) - 1, -1, -1):
+                pending.append((hijos[position], child_level, None))
+                pending.append((None, 0, (",\n" if position else "[\n") + child_pad))
     
     def to_formatted_string(self, indent: int = 0) -> str:
         """
@@ -373,54 +684,69 @@ class AnnotatedASTNode(Nodo):
         Returns:
             Cadena formateada del AST con anotaciones semánticas
         """
-        indent_str = "  " * indent
-        result = f"{indent_str}{self.tipo}"
-        
-        # Agregar valor si existe
-        if self.semantic_value is not None:
-            result += f": {self.semantic_value}"
-        elif self.valor:
-            result += f": {self.valor}"
-        
-        # Agregar información de posición
-        result += f" (L{self.linea}, C{self.columna})"
-        
-        # Agregar información semántica
-        semantic_parts = []
-        
-        if self.semantic_type:
-            semantic_parts.append(f"tipo={self.semantic_type}")
-        
-        if self.semantic_value is not None:
-            semantic_parts.append(f"valor={self.semantic_value}")
-        
-        if self.symbol_ref:
-            semantic_parts.append(f"símbolo={self.symbol_ref.name}@{self.symbol_ref.scope}")
-        
-        if self.is_lvalue:
-            semantic_parts.append("lvalue")
-        
-        if self.is_constant:
-            semantic_parts.append("constante")
-        
-        if semantic_parts:
-            result += f" [{', '.join(semantic_parts)}]"
-        
-        result += "\n"
+        parts = []
+        self.write_formatted(parts.append, indent)
+        return "".join(parts)
+    
+    def write_formatted(self, write, indent: int = 0):
+        """
+        Emite la representación formateada del AST anotado línea por línea
         
-        # Procesar hijos
-        for hijo in self.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                result += hijo.to_formatted_string(indent + 1)
-            else:
+        Args:
+            write: Función que recibe cada fragmento de texto (ej. list.append o file.write)
+            indent: Nivel de indentación inicial
+        """
+        # Recorrido en preorden con pila explícita de (nodo, nivel)
+        pending = [(self, indent)]
+        while pending:
+            node, level = pending.pop()
+            indent_str = "  " * level
+            
+            if not isinstance(node, AnnotatedASTNode):
                 # Para nodos no anotados, usar representación básica
-                hijo_str = f"{indent_str}  {hijo.tipo}"
-                if hijo.valor:
-                    hijo_str += f": {hijo.valor}"
-                hijo_str += f" (L{hijo.linea}, C{hijo.columna})\n"
-                result += hijo_str
-        
-        return result
+                hijo_str = f"{indent_str}{node.tipo}"
+                if node.valor:
+                    hijo_str += f": {node.valor}"
+                write(f"{hijo_str} (L{node.linea}, C{node.columna})\n")
+                continue
+            
+            result = f"{indent_str}{node.tipo}"
+            
+            # Agregar valor si existe
+            if node.semantic_value is not None:
+                result += f": {node.semantic_value}"
+            elif node.valor:
+                result += f": {node.valor}"
+            
+            # Agregar información de posición
+            result += f" (L{node.linea}, C{node.columna})"
+            
+            # Agregar información semántica
+            semantic_parts = []
+            
+            if node.semantic_type:
+                semantic_parts.append(f"tipo={node.semantic_type}")
+            
+            if node.semantic_value is not None:
+                semantic_parts.append(f"valor={node.semantic_value}")
+            
+            if node.symbol_ref:
+                semantic_parts.append(f"símbolo={node.symbol_ref.name}@{node.symbol_ref.scope}")
+            
+            if node.is_lvalue:
+                semantic_parts.append("lvalue")
+            
+            if node.is_constant:
+                semantic_parts.append("constante")
+            
+            if semantic_parts:
+                result += f" [{', '.join(semantic_parts)}]"
+            
+            write(result + "\n")
+            
+            # Procesar hijos (en orden inverso para respetar el preorden)
+            child_level = level + 1
+            pending.extend((hijo, child_level) for hijo in reversed(node.hijos))
     
     @staticmethod
     def create_annotated_ast(root_node: Nodo, type_system: 'TypeSystem', 
@@ -436,15 +762,15 @@ class AnnotatedASTNode(Nodo):
         Returns:
             Nodo raíz del AST anotado con información semántica completa
         """
-        # Crear nodo anotado desde el nodo original
-        annotated_root = AnnotatedASTNode.from_node(root_node)
+        # Crear el árbol anotado (hijos primero, sin copias intermedias)
+        annotated_root = AnnotatedASTNode.wrap_tree(root_node)
         
-        # Convertir todos los hijos a nodos anotados
-        annotated_root.annotate_children()
-        
-        # Anotar con información de tipos y símbolos
-        annotated_root.annotate_with_type_info(type_system, symbol_table)
-        annotated_root.annotate_with_symbol_references(symbol_table)
+        # Anotar con información de tipos y símbolos (un solo recorrido)
+        type_system.begin_pass()
+        try:
+            annotated_root.annotate_with_type_info(type_system, symbol_table)
+        finally:
+            type_system.end_pass()
         
         return annotated_root
 
@@ -487,8 +813,7 @@ class ASTAnnotator:
         Returns:
             Nodo de expresión anotado
         """
-        annotated_expr = AnnotatedASTNode.from_node(expr_node)
-        annotated_expr.annotate_children()
+        annotated_expr = AnnotatedASTNode.wrap_tree(expr_node)
         annotated_expr.annotate_with_type_info(self.type_system, self.symbol_table)
         return annotated_expr
     
@@ -560,8 +885,7 @@ class ASTAnnotator:
         elif format_type == 'formatted_string':
             return annotated_ast.to_formatted_string()
         elif format_type == 'json':
-            import json
-            return json.dumps(annotated_ast.to_annotated_dict(), indent=2, ensure_ascii=False)
+            return _encode_json(annotated_ast.to_annotated_dict()).decode('utf-8')
         else:
             raise ValueError(f"Formato no soportado: {format_type}")
     
@@ -579,9 +903,15 @@ class ASTAnnotator:
             True si se guardó exitosamente, False en caso de error
         """
         try:
+            if format_type == 'json':
+                # Escribir los bytes UTF-8 directamente, sin decodificar/recodificar
+                with open(filename, 'wb') as f:
+                    f.write(_encode_json(annotated_ast.to_annotated_dict()))
+                return True
+            
             content = self.export_annotated_ast(annotated_ast, format_type)
             
-            with open(filename, 'w', encoding='utf-8') as f:
+            with open(filename, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
                 f.write(content)
             
             return True
@@ -606,9 +936,8 @@ class ASTAnnotator:
         if annotated_ast.tipo == node_type:
             nodes.append(annotated_ast)
         
-        for hijo in annotated_ast.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                nodes.extend(self.get_nodes_by_type(hijo, node_type))
+        for hijo in annotated_ast.annotated_children():
+            nodes.extend(self.get_nodes_by_type(hijo, node_type))
         
         return nodes
     
@@ -627,9 +956,8 @@ class ASTAnnotator:
         if annotated_ast.has_semantic_info():
             nodes.append(annotated_ast)
         
-        for hijo in annotated_ast.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                nodes.extend(self.get_nodes_with_semantic_info(hijo))
+        for hijo in annotated_ast.annotated_children():
+            nodes.extend(self.get_nodes_with_semantic_info(hijo))
         
         return nodes
     
@@ -643,50 +971,54 @@ class ASTAnnotator:
         Returns:
             Reporte formateado de las anotaciones
         """
-        report = "REPORTE DE ANOTACIONES SEMÁNTICAS\n"
-        report += "=" * 50 + "\n\n"
-        
-        # Contar nodos por tipo
-        all_nodes = self._get_all_nodes(annotated_ast)
-        nodes_with_semantic = self.get_nodes_with_semantic_info(annotated_ast)
-        
-        report += f"Total de nodos: {len(all_nodes)}\n"
-        report += f"Nodos con información semántica: {len(nodes_with_semantic)}\n"
-        report += f"Porcentaje anotado: {len(nodes_with_semantic)/len(all_nodes)*100:.1f}%\n\n"
-        
-        # Detalles por tipo de nodo
-        type_counts = {}
-        for node in nodes_with_semantic:
-            if node.tipo not in type_counts:
-                type_counts[node.tipo] = 0
-            type_counts[node.tipo] += 1
+        # Recolectar conteos y referencias en un solo recorrido (preorden)
+        total_nodes = 0
+        annotated_count = 0
+        type_counts = Counter()
+        symbol_refs = []
+        
+        pending = [annotated_ast]
+        while pending:
+            node = pending.pop()
+            total_nodes += 1
+            if node.has_semantic_info():
+                annotated_count += 1
+                type_counts[node.tipo] += 1
+                if node.symbol_ref:
+                    symbol_refs.append(node)
+            pending.extend(reversed(node.annotated_children()))
+        
+        partes = [
+            "REPORTE DE ANOTACIONES SEMÁNTICAS\n",
+            "=" * 50 + "\n\n",
+            f"Total de nodos: {total_nodes}\n",
+            f"Nodos con información semántica: {annotated_count}\n",
+            f"Porcentaje anotado: {annotated_count/total_nodes*100:.1f}%\n\n",
+        ]
         
         if type_counts:
-            report += "NODOS ANOTADOS POR TIPO:\n"
-            report += "-" * 30 + "\n"
+            partes.append("NODOS ANOTADOS POR TIPO:\n")
+            partes.append("-" * 30 + "\n")
             for node_type, count in sorted(type_counts.items()):
-                report += f"{node_type}: {count}\n"
-            report += "\n"
+                partes.append(f"{node_type}: {count}\n")
+            partes.append("\n")
         
         # Información de símbolos referenciados
-        symbol_refs = [node for node in nodes_with_semantic if node.symbol_ref]
         if symbol_refs:
-            report += "REFERENCIAS DE SÍMBOLOS:\n"
-            report += "-" * 30 + "\n"
+            partes.append("REFERENCIAS DE SÍMBOLOS:\n")
+            partes.append("-" * 30 + "\n")
             for node in symbol_refs:
-                report += f"Variable '{node.symbol_ref.name}' (tipo: {node.symbol_ref.type_info}) "
-                report += f"en línea {node.linea}\n"
-            report += "\n"
+                partes.append(
+                    f"Variable '{node.symbol_ref.name}' (tipo: {node.symbol_ref.type_info}) "
+                    f"en línea {node.linea}\n"
+                )
+            partes.append("\n")
         
-        return report
+        return "".join(partes)
     
-    def _get_all_nodes(self, node: AnnotatedASTNode) -> List[AnnotatedASTNode]:
-        """Obtiene todos los nodos del AST recursivamente"""
-        nodes = [node]
-        for hijo in node.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                nodes.extend(self._get_all_nodes(hijo))
-        return nodes
+
+# Marcador para distinguir "no está en caché" de un resultado None
+_NOT_FOUND = object()
 
 class SymbolTable:
     """Maneja la tabla de símbolos con soporte para ámbitos anidados"""
@@ -695,8 +1027,15 @@ class SymbolTable:
         """Inicializa la tabla de símbolos con el ámbito global"""
         self.scopes = []  # Pila de ámbitos
         self.symbols = {}  # Diccionario de símbolos por ámbito
+        self._scope_chain = ChainMap()  # Vista encadenada de los ámbitos activos (del actual al global)
+        self._lookup_cache = {}  # Búsquedas resueltas para la pila de ámbitos actual
+        self._scope_order = {}  # Orden de creación de cada ámbito
+        self._all_symbols = []  # Lista plana de símbolos, agrupada por orden de ámbito
         self.current_scope_id = 0  # ID único para cada ámbito
         self.memory_counter = 1000  # Contador para direcciones de memoria
+        self.version = 0  # Aumenta con cada cambio que puede alterar una búsqueda
+        self._usage_count = 0  # Usos registrados (modifican las líneas de los símbolos)
+        self._formatted_table = None  # ((version, usos), texto) de la última tabla formateada
         
         # Crear ámbito global
         self.enter_scope("global")
@@ -709,8 +1048,13 @@ class SymbolTable:
         scope_id = f"{scope_name}_{self.current_scope_id}"
         self.current_scope_id += 1
         
+        scope_symbols = {}
         self.scopes.append(scope_id)
-        self.symbols[scope_id] = {}
+        self.symbols[scope_id] = scope_symbols
+        self._scope_order[scope_id] = len(self._scope_order)
+        # Un ámbito nuevo está vacío: ninguna búsqueda cambia de resultado, así
+        # que no se invalidan las cachés (declare_variable lo hará si hace falta)
+        self._scope_chain = self._scope_chain.new_child(scope_symbols)
         
         return scope_id
     
@@ -718,6 +1062,12 @@ class SymbolTable:
         """Sale del ámbito actual"""
         if len(self.scopes) > 1:  # No permitir salir del ámbito global
             scope_id = self.scopes.pop()
+            exited_symbols = self._scope_chain.maps[0]
+            self._scope_chain = self._scope_chain.parents
+            # Salir de un ámbito sin declaraciones tampoco altera las búsquedas
+            if exited_symbols:
+                self._lookup_cache.clear()
+                self.version += 1
             return scope_id
         return None
     
@@ -749,9 +1099,12 @@ class SymbolTable:
         
         # Agregar al ámbito actual
         if current_scope not in self.symbols:
-            self.symbols[current_scope] = {}
+            self.symbols[current_scope] = self._scope_chain.maps[0]
         
         self.symbols[current_scope][name] = symbol_entry
+        self._lookup_cache.pop(name, None)
+        self.version += 1
+        insort(self._all_symbols, symbol_entry, key=self._symbol_scope_order)
         self.memory_counter += 4  # Incrementar dirección de memoria (asumiendo 4 bytes por variable)
         
         return True
@@ -761,12 +1114,19 @@ class SymbolTable:
         Busca una variable en los ámbitos (desde el actual hacia el global)
         Retorna la entrada del símbolo si se encuentra, None si no existe
         """
-        # Buscar desde el ámbito actual hacia el global
-        for scope_id in reversed(self.scopes):
-            if scope_id in self.symbols and name in self.symbols[scope_id]:
-                return self.symbols[scope_id][name]
-        
-        return None
+        cached = self._lookup_cache.get(name, _NOT_FOUND)
+        if cached is not _NOT_FOUND:
+            return cached
+        
+        # Buscar desde el ámbito actual hacia el global; se recorren los mapas
+        # directamente porque ChainMap.get revisa la cadena dos veces
+        symbol = None
+        for scope_symbols in self._scope_chain.maps:
+            symbol = scope_symbols.get(name)
+            if symbol is not None:
+                break
+        self._lookup_cache[name] = symbol
+        return symbol
     
     def is_declared(self, name: str) -> bool:
         """Verifica si una variable está declarada en cualquier ámbito accesible"""
@@ -796,15 +1156,20 @@ class SymbolTable:
             # SIEMPRE agregar la línea, incluso si ya existe
             # Esto permite que "y = y + 1" registre la línea 9 dos veces
             symbol.lines.append(line)
+            self._usage_count += 1
             # NO ordenar ni eliminar duplicados - queremos contar cada aparición
     
+    def _symbol_scope_order(self, symbol: SymbolEntry) -> int:
+        """Clave de orden de un símbolo: posición de creación de su ámbito"""
+        return self._scope_order.get(symbol.scope, len(self._scope_order))
+    
     def get_all_symbols(self) -> List[SymbolEntry]:
         """Obtiene todas las entradas de símbolos de todos los ámbitos"""
-        all_symbols = []
-        for scope_id in self.symbols:
-            for symbol in self.symbols[scope_id].values():
-                all_symbols.append(symbol)
-        return all_symbols
+        return self._all_symbols.copy()
+    
+    def get_symbol_count(self) -> int:
+        """Obtiene el número de símbolos declarados sin copiar la lista"""
+        return len(self._all_symbols)
     
     def get_symbols_in_scope(self, scope_name: str = None) -> List[SymbolEntry]:
         """Obtiene todas las entradas de símbolos de un ámbito específico"""
@@ -817,89 +1182,82 @@ class SymbolTable:
     
     def to_formatted_table(self) -> str:
         """Genera una representación formateada de la tabla de símbolos con ancho adaptable"""
-        if not any(self.symbols.values()):
+        # Reutilizar la tabla si no hubo declaraciones, cambios de ámbito ni usos nuevos
+        state = (self.version, self._usage_count)
+        cached = self._formatted_table
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        
+        table = self._format_table()
+        self._formatted_table = (state, table)
+        return table
+    
+    def _format_table(self) -> str:
+        """Construye el texto de to_formatted_table() sin consultar la caché"""
+        if not self._all_symbols:
             return "Tabla de símbolos vacía"
         
-        all_symbols = self.get_all_symbols()
-        all_symbols.sort(key=lambda s: (s.scope, s.lines[0] if s.lines else 0))
+        all_symbols = sorted(self._all_symbols, key=lambda s: (s.scope, s.lines[0] if s.lines else 0))
         
-        # Calcular anchos máximos para cada columna
-        max_widths = {
-            "Nombre": len("Nombre"),
-            "Tipo": len("Tipo"),
-            "Líneas": len("Líneas"),
-            "Dirección": len("Dirección")
-        }
+        # Calcular el texto de cada celda una sola vez
+        rows = [
+            (symbol.name, str(symbol.type_info), ", ".join(map(str, symbol.lines)),
+             str(symbol.memory_address or "N/A"))
+            for symbol in all_symbols
+        ]
         
-        for symbol in all_symbols:
-            max_widths["Nombre"] = max(max_widths["Nombre"], len(symbol.name))
-            max_widths["Tipo"] = max(max_widths["Tipo"], len(str(symbol.type_info)))
-            max_widths["Líneas"] = max(max_widths["Líneas"], len(", ".join(map(str, symbol.lines))))
-            max_widths["Dirección"] = max(max_widths["Dirección"], len(str(symbol.memory_address or "N/A")))
-            
-        # Formato de la tabla
-        resultado = "TABLA DE SÍMBOLOS:\n"
+        # Calcular anchos máximos para cada columna
+        name_width = max(len("Nombre"), *(len(row[0]) for row in rows))
+        type_width = max(len("Tipo"), *(len(row[1]) for row in rows))
+        lines_width = max(len("Líneas"), *(len(row[2]) for row in rows))
+        address_width = max(len("Dirección"), *(len(row[3]) for row in rows))
         
         # Crear el formato de la línea del encabezado y de los datos
-        header_format_str = "| {name:<{name_width}} | {type:<{type_width}} | {lines:<{lines_width}} | {address:<{address_width}} |\n"
-        row_format_str = "| {name:<{name_width}} | {type:<{type_width}} | {lines:<{lines_width}} | {address:<{address_width}} |\n"
-        
-        header_line = header_format_str.format(
-            name="Nombre", name_width=max_widths["Nombre"],
-            type="Tipo", type_width=max_widths["Tipo"],
-            lines="Líneas", lines_width=max_widths["Líneas"],
-            address="Dirección", address_width=max_widths["Dirección"]
-        )
+        row_format_str = (f"| %-{name_width}s | %-{type_width}s | "
+                          f"%-{lines_width}s | %-{address_width}s |\n")
         
-        separator_len = len(header_line) - 1
-        separator = "=" * separator_len + "\n"
-
-        resultado += separator
-        resultado += header_line
-        resultado += separator
-        
-        for symbol in all_symbols:
-            lines_str = ", ".join(map(str, symbol.lines))
-            resultado += row_format_str.format(
-                name=symbol.name, name_width=max_widths["Nombre"],
-                type=str(symbol.type_info), type_width=max_widths["Tipo"],
-                lines=lines_str, lines_width=max_widths["Líneas"],
-                address=symbol.memory_address or "N/A", address_width=max_widths["Dirección"]
-            )
+        header_line = row_format_str % ("Nombre", "Tipo", "Líneas", "Dirección")
+        separator = "=" * (len(header_line) - 1) + "\n"
         
-        resultado += separator
-        return resultado
+        parts = ["TABLA DE SÍMBOLOS:\n", separator, header_line, separator]
+        parts.extend(row_format_str % row for row in rows)
+        parts.append(separator)
+        return "".join(parts)
     
     def to_export_format(self) -> Dict[str, Any]:
         """Exporta la tabla de símbolos en formato diccionario para la GUI"""
-        export_data = {
+        return {
             'scopes': self.scopes.copy(),
             'current_scope': self.get_current_scope(),
-            'symbols_by_scope': {},
-            'total_symbols': 0
+            'symbols_by_scope': {
+                scope_id: [
+                    {
+                        'name': symbol.name,
+                        'type': str(symbol.type_info),
+                        'lines': symbol.lines,
+                        'column': symbol.column,
+                        'memory_address': symbol.memory_address,
+                        'is_initialized': symbol.is_initialized
+                    }
+                    for symbol in symbols.values()
+                ]
+                for scope_id, symbols in self.symbols.items()
+            },
+            # La lista plana contiene exactamente los símbolos de todos los ámbitos
+            'total_symbols': len(self._all_symbols)
         }
-        
-        for scope_id, symbols in self.symbols.items():
-            export_data['symbols_by_scope'][scope_id] = []
-            for symbol in symbols.values():
-                export_data['symbols_by_scope'][scope_id].append({
-                    'name': symbol.name,
-                    'type': str(symbol.type_info),
-                    'lines': symbol.lines,
-                    'column': symbol.column,
-                    'memory_address': symbol.memory_address,
-                    'is_initialized': symbol.is_initialized
-                })
-                export_data['total_symbols'] += 1
-        
-        return export_data
     
     def clear(self):
         """Limpia la tabla de símbolos y reinicia al ámbito global"""
         self.scopes.clear()
         self.symbols.clear()
+        self._scope_chain = ChainMap()
+        self._lookup_cache.clear()
+        self._scope_order.clear()
+        self._all_symbols.clear()
         self.current_scope_id = 0
         self.memory_counter = 1000
+        self.version += 1
         self.enter_scope("global")
     
     def get_scope_depth(self) -> int:
@@ -910,6 +1268,15 @@ class SymbolTable:
         """Representación en cadena de la tabla de símbolos"""
         return self.to_formatted_table()
 
+# Tipo de cada literal según su tipo de nodo
+_LITERAL_TYPES = {
+    'NUM_INT': TypeInfo.get('int'),
+    'NUM_FLOAT': TypeInfo.get('float'),
+    'TRUE': TypeInfo.get('boolean'),
+    'FALSE': TypeInfo.get('boolean'),
+    'BOOLEANO': TypeInfo.get('boolean'),
+}
+
 class TypeSystem:
     """Sistema de tipos para verificación de compatibilidad y conversiones automáticas"""
     
@@ -923,29 +1290,113 @@ class TypeSystem:
             'int': ['float'],  # int puede ser promovido a float
         }
         
+        # Pares (origen, destino) de promoción derivados de las reglas anteriores
+        self._promotion_edges = frozenset(
+            (from_base, to_base)
+            for from_base, targets in self.promotion_rules.items()
+            for to_base in targets
+        )
+        
         # Operadores aritméticos válidos por tipo
         self.arithmetic_operators = {
-            'int': ['+', '-', '*', '/', '%', '^'],
-            'float': ['+', '-', '*', '/', '^'],  # float no soporta módulo
-            'boolean': [],  # boolean no soporta operadores aritméticos
-            'void': []
+            'int': frozenset({'+', '-', '*', '/', '%', '^'}),
+            'float': frozenset({'+', '-', '*', '/', '^'}),  # float no soporta módulo
+            'boolean': _NO_OPERATORS,  # boolean no soporta operadores aritméticos
+            'void': _NO_OPERATORS
         }
         
         # Operadores relacionales válidos por tipo
         self.relational_operators = {
-            'int': ['>', '<', '>=', '<=', '==', '!='],
-            'float': ['>', '<', '>=', '<=', '==', '!='],
-            'boolean': ['==', '!='],
-            'void': []
+            'int': _RELATIONAL_OPERATORS,
+            'float': _RELATIONAL_OPERATORS,
+            'boolean': frozenset({'==', '!='}),
+            'void': _NO_OPERATORS
         }
         
         # Operadores lógicos válidos por tipo
         self.logical_operators = {
-            'boolean': ['&&', '||', '!'],
-            'int': [],  # int no soporta operadores lógicos directamente
-            'float': [],
-            'void': []
+            'boolean': frozenset({'&&', '||', '!'}),
+            'int': _NO_OPERATORS,  # int no soporta operadores lógicos directamente
+            'float': _NO_OPERATORS,
+            'void': _NO_OPERATORS
         }
+        
+        # Tipos inferidos por nodo: id(nodo) -> (nodo, tipo). Se guarda el nodo
+        # para que su id no pueda reutilizarse mientras la entrada exista
+        self._infer_cache: Dict[int, Tuple[Any, Optional[TypeInfo]]] = {}
+        # Raíces de expresiones ya validadas sin errores: id(nodo) -> nodo
+        self._validated_clean: Dict[int, Any] = {}
+        # Tabla de símbolos y versión con las que se llenaron ambas cachés
+        self._cache_state = None
+        # Recorridos en curso: las cachés sólo se usan dentro de un recorrido
+        # (begin_pass/end_pass), porque no detectan cambios en el árbol
+        self._pass_depth = 0
+        
+        # Despacho por tipo de nodo para inferencia y validación de expresiones
+        self._infer_dispatch = {'ID': self._infer_identifier_type, '=': self._infer_assignment_type}
+        self._validation_dispatch = {'=': self._validate_assignment_expression}
+        for tipo in _CONTAINER_NODE_TYPES:
+            self._infer_dispatch[tipo] = self._infer_container_type
+        for tipo in _LITERAL_TYPES:
+            self._infer_dispatch[tipo] = self._infer_literal_type
+        for operator in _ARITHMETIC_OPERATORS:
+            self._infer_dispatch[operator] = self._infer_arithmetic_expression_type
+            self._validation_dispatch[operator] = self._validate_arithmetic_expression
+        for operator in _RELATIONAL_OPERATORS:
+            self._infer_dispatch[operator] = self._infer_relational_expression_type
+            self._validation_dispatch[operator] = self._validate_relational_expression
+        for operator in _LOGICAL_OPERATORS:
+            self._infer_dispatch[operator] = self._infer_logical_expression_type
+            self._validation_dispatch[operator] = self._validate_logical_expression
+        
+        # Resultados memorizados de check_compatibility y can_convert por par de tipos;
+        # dependen de promotion_rules
+        self._compatibility_cache: Dict[Tuple[TypeInfo, TypeInfo], bool] = {}
+        self._conversion_cache: Dict[Tuple[TypeInfo, TypeInfo], bool] = {}
+        
+        # Clasificación memorizada de operaciones: (operador, tipo izq., tipo der.) ->
+        # (compatibles, tipo resultado)
+        self._operation_cache: Dict[Tuple[str, TypeInfo, TypeInfo], Tuple[bool, Optional[TypeInfo]]] = {}
+        
+        # Tabla de resultados aritméticos: (operador, tipo base izq., tipo base der.) -> tipo.
+        # Se precalcula para los tipos básicos; depende de arithmetic_operators
+        self._arithmetic_results: Dict[Tuple[str, str, str], Optional[TypeInfo]] = {}
+        for operator in _ARITHMETIC_OPERATORS:
+            for left_base in self.basic_types:
+                for right_base in self.basic_types:
+                    self._arithmetic_results[(operator, left_base, right_base)] = (
+                        self._compute_arithmetic_operation_result(
+                            operator, TypeInfo.get(left_base), TypeInfo.get(right_base)))
+    
+    def clear_cache(self):
+        """Descarta los tipos inferidos y las validaciones memorizadas"""
+        self._infer_cache.clear()
+        self._validated_clean.clear()
+        self._cache_state = None
+    
+    def begin_pass(self):
+        """
+        Inicia un recorrido del AST durante el cual se memorizan los tipos
+        inferidos y las expresiones validadas; el árbol no debe modificarse
+        hasta el end_pass() correspondiente
+        """
+        if not self._pass_depth:
+            self.clear_cache()
+        self._pass_depth += 1
+    
+    def end_pass(self):
+        """Termina un recorrido iniciado con begin_pass() y descarta las cachés"""
+        self._pass_depth -= 1
+        if not self._pass_depth:
+            self.clear_cache()
+    
+    def _sync_cache_state(self, symbol_table):
+        """Descarta las cachés si la tabla de símbolos cambió desde que se llenaron"""
+        state = (symbol_table, symbol_table.version if symbol_table is not None else None)
+        if state != self._cache_state:
+            self._infer_cache.clear()
+            self._validated_clean.clear()
+            self._cache_state = state
     
     def get_type(self, node) -> Optional[TypeInfo]:
         """
@@ -956,29 +1407,26 @@ class TypeSystem:
             return None
         
         # Si el nodo ya tiene tipo semántico asignado
-        if hasattr(node, 'semantic_type') and node.semantic_type:
-            return node.semantic_type
+        semantic_type = node.semantic_type
+        if semantic_type:
+            return semantic_type
         
         # Inferir tipo basado en el tipo de nodo
-        if node.tipo == 'NUM_INT':
-            return TypeInfo('int')
-        elif node.tipo == 'NUM_FLOAT':
-            return TypeInfo('float')
-        elif node.tipo in ['TRUE', 'FALSE', 'BOOLEANO']:
-            return TypeInfo('boolean')
+        if node.tipo in _LITERAL_TYPES:
+            return _LITERAL_TYPES[node.tipo]
         elif node.tipo == 'ID':
             # Para identificadores, necesitamos consultar la tabla de símbolos
             # Esto se manejará en el analizador semántico principal
             return None
-        elif node.tipo in ['+', '-', '*', '/', '%', '^']:
+        elif node.tipo in _ARITHMETIC_OPERATORS:
             # Para operadores aritméticos, calcular tipo resultado
             return self._get_arithmetic_result_type(node)
-        elif node.tipo in ['>', '<', '>=', '<=', '==', '!=']:
+        elif node.tipo in _RELATIONAL_OPERATORS:
             # Operadores relacionales siempre retornan boolean
-            return TypeInfo('boolean')
-        elif node.tipo in ['&&', '||']:
+            return TIPO_BOOLEAN
+        elif node.tipo in _LOGICAL_OPERATORS:
             # Operadores lógicos siempre retornan boolean
-            return TypeInfo('boolean')
+            return TIPO_BOOLEAN
         elif node.tipo == '=':
             # Asignación retorna el tipo del lado derecho
             if len(node.hijos) >= 2:
@@ -1007,17 +1455,28 @@ class TypeSystem:
         if not type1 or not type2:
             return False
         
+        key = (type1, type2)
+        compatible = self._compatibility_cache.get(key)
+        if compatible is None:
+            compatible = self._compute_compatibility(type1, type2)
+            self._compatibility_cache[key] = compatible
+        return compatible
+    
+    def _compute_compatibility(self, type1: TypeInfo, type2: TypeInfo) -> bool:
+        """Calcula la compatibilidad entre dos tipos (sin caché)"""
         # Tipos exactamente iguales
         if (type1.base_type == type2.base_type and 
             type1.is_array == type2.is_array and 
             type1.array_size == type2.array_size):
             return True
         
-        # Verificar promoción automática
-        if self.can_convert(type1, type2) or self.can_convert(type2, type1):
-            return True
-        
-        return False
+        # Verificar promoción automática en cualquiera de los dos sentidos
+        # (nunca entre arrays y no-arrays)
+        if type1.is_array != type2.is_array:
+            return False
+        promotion_edges = self._promotion_edges
+        return ((type1.base_type, type2.base_type) in promotion_edges or
+                (type2.base_type, type1.base_type) in promotion_edges)
     
     def can_convert(self, from_type: TypeInfo, to_type: TypeInfo) -> bool:
         """
@@ -1026,15 +1485,21 @@ class TypeSystem:
         if not from_type or not to_type:
             return False
         
+        key = (from_type, to_type)
+        convertible = self._conversion_cache.get(key)
+        if convertible is None:
+            convertible = self._compute_conversion(from_type, to_type)
+            self._conversion_cache[key] = convertible
+        return convertible
+    
+    def _compute_conversion(self, from_type: TypeInfo, to_type: TypeInfo) -> bool:
+        """Calcula si existe conversión automática entre dos tipos (sin caché)"""
         # No conversión entre arrays y no-arrays
         if from_type.is_array != to_type.is_array:
             return False
         
         # Verificar reglas de promoción
-        if from_type.base_type in self.promotion_rules:
-            return to_type.base_type in self.promotion_rules[from_type.base_type]
-        
-        return False
+        return (from_type.base_type, to_type.base_type) in self._promotion_edges
     
     def perform_conversion(self, value: Any, from_type: TypeInfo, to_type: TypeInfo) -> Any:
         """
@@ -1056,46 +1521,72 @@ class TypeSystem:
         """
         Determina el tipo resultado de una operación entre dos tipos
         """
+        return self._classify_operation(operator, left_type, right_type)[1]
+    
+    def _classify_operation(self, operator: str, left_type: TypeInfo, right_type: TypeInfo) -> Tuple[bool, Optional[TypeInfo]]:
+        """
+        Determina en una sola consulta si los operandos son compatibles y el tipo
+        resultado de la operación
+        Retorna (compatibles, tipo_resultado)
+        """
         if not left_type or not right_type:
-            return None
+            return False, None
+        
+        key = (operator, left_type, right_type)
+        classification = self._operation_cache.get(key)
+        if classification is not None:
+            return classification
+        
+        compatible = self.check_compatibility(left_type, right_type)
+        result_type = None
         
         # Operadores relacionales siempre retornan boolean
-        if operator in ['>', '<', '>=', '<=', '==', '!=']:
+        if operator in _RELATIONAL_OPERATORS:
             # Verificar que los operandos sean compatibles
-            if self.check_compatibility(left_type, right_type):
-                return TypeInfo('boolean')
-            return None
+            if compatible:
+                result_type = TIPO_BOOLEAN
         
         # Operadores lógicos requieren operandos boolean
-        if operator in ['&&', '||']:
+        elif operator in _LOGICAL_OPERATORS:
             if left_type.base_type == 'boolean' and right_type.base_type == 'boolean':
-                return TypeInfo('boolean')
-            return None
+                result_type = TIPO_BOOLEAN
         
         # Operadores aritméticos
-        if operator in ['+', '-', '*', '/', '%', '^']:
-            return self._get_arithmetic_operation_result(operator, left_type, right_type)
+        elif operator in _ARITHMETIC_OPERATORS:
+            result_type = self._get_arithmetic_operation_result(operator, left_type, right_type)
         
-        return None
+        classification = (compatible, result_type)
+        self._operation_cache[key] = classification
+        return classification
     
     def _get_arithmetic_operation_result(self, operator: str, left_type: TypeInfo, right_type: TypeInfo) -> Optional[TypeInfo]:
+        """Obtiene el tipo resultado de operaciones aritméticas desde la tabla precalculada"""
+        # El resultado sólo depende del operador y de los tipos base
+        key = (operator, left_type.base_type, right_type.base_type)
+        result = self._arithmetic_results.get(key, _NOT_FOUND)
+        if result is _NOT_FOUND:
+            result = self._compute_arithmetic_operation_result(operator, left_type, right_type)
+            self._arithmetic_results[key] = result
+        return result
+    
+    def _compute_arithmetic_operation_result(self, operator: str, left_type: TypeInfo, right_type: TypeInfo) -> Optional[TypeInfo]:
         """Calcula el tipo resultado de operaciones aritméticas"""
         # Verificar que ambos tipos sean numéricos
         if not (left_type.is_numeric() and right_type.is_numeric()):
             return None
         
         # Verificar que el operador sea válido para ambos tipos
-        if (operator not in self.arithmetic_operators.get(left_type.base_type, []) or
-            operator not in self.arithmetic_operators.get(right_type.base_type, [])):
+        if (operator not in self.arithmetic_operators.get(left_type.base_type, _NO_OPERATORS) or
+            operator not in self.arithmetic_operators.get(right_type.base_type, _NO_OPERATORS)):
             return None
         
         # Reglas de promoción de tipos en operaciones
         if left_type.base_type == 'float' or right_type.base_type == 'float':
             # Si cualquier operando es float, el resultado es float
-            return TypeInfo('float')
+            return TIPO_FLOAT
         elif left_type.base_type == 'int' and right_type.base_type == 'int':
             # Si ambos son int, el resultado es int
-            return TypeInfo('int')
+            return TIPO_INT
         
         return None
     
@@ -1136,7 +1627,7 @@ class TypeSystem:
                 else:
                     return False, f"Operador '!' requiere operando boolean, se encontró {operand_type}"
             
-            if operator in ['+', '-']:  # Operadores unarios aritméticos
+            if operator in _UNARY_ARITHMETIC_OPERATORS:  # Operadores unarios aritméticos
                 if operand_type.is_numeric():
                     return True, None
                 else:
@@ -1146,12 +1637,14 @@ class TypeSystem:
         elif len(operand_types) == 2:
             left_type, right_type = operand_types
             
+            # Compatibilidad y tipo resultado en una sola consulta
+            compatible, result_type = self._classify_operation(operator, left_type, right_type)
+            
             # Verificar compatibilidad de tipos
-            if not self.check_compatibility(left_type, right_type):
+            if not compatible:
                 return False, f"Tipos incompatibles para operador '{operator}': {left_type} y {right_type}"
             
             # Verificar que el operador sea válido para estos tipos
-            result_type = self.get_operation_result_type(operator, left_type, right_type)
             if result_type is None:
                 return False, f"Operador '{operator}' no válido para tipos {left_type} y {right_type}"
             
@@ -1207,67 +1700,62 @@ class TypeSystem:
             return None
         
         # Si ya tiene tipo asignado, retornarlo
-        if hasattr(node, 'semantic_type') and node.semantic_type:
-            return node.semantic_type
-
-        # Nodos contenedores - desenvolver sin error
-        if node.tipo in ['SENT_EXPRESION', 'COMPONENTE', 'EXPRESION_SIMPLE',
-                        'FACTOR_SIMPLE', 'TERMINO_SIMPLE', 'SALIDA', 
-                        'LISTA_SENTENCIAS', 'IDENTIFICADOR']:
-            if len(node.hijos) == 1:
-                return self.infer_expression_type(node.hijos[0], symbol_table)
-            elif len(node.hijos) > 0:
-                # Para contenedores con múltiples hijos, devolver None sin error
-                return None
-            return None
+        semantic_type = node.semantic_type
+        if semantic_type:
+            return semantic_type
         
-        # Literales
-        if node.tipo == 'NUM_INT':
-            return TypeInfo('int')
-        elif node.tipo == 'NUM_FLOAT':
-            return TypeInfo('float')
-        elif node.tipo in ['TRUE', 'FALSE', 'BOOLEANO']:
-            return TypeInfo('boolean')
+        # Sin recorrido en curso (o sin tabla de símbolos) no se memoriza nada
+        if not self._pass_depth or symbol_table is None:
+            return self._infer_node_type(node, symbol_table)
         
-        # Identificadores - requiere tabla de símbolos
-        elif node.tipo == 'ID':
-            if symbol_table:
-                symbol = symbol_table.lookup_variable(node.valor)
-                if symbol:
-                    return symbol.type_info
-            return None  # Variable no declarada
+        # La caché sólo es válida mientras la tabla de símbolos no cambie
+        self._sync_cache_state(symbol_table)
         
-        # Expresiones aritméticas
-        elif node.tipo in ['+', '-', '*', '/', '%', '^']:
-            return self._infer_arithmetic_expression_type(node, symbol_table)
-        
-        # Expresiones relacionales
-        elif node.tipo in ['>', '<', '>=', '<=', '==', '!=']:
-            return self._infer_relational_expression_type(node, symbol_table)
-        
-        # Expresiones lógicas
-        elif node.tipo in ['&&', '||']:
-            return self._infer_logical_expression_type(node, symbol_table)
-        
-        # Asignación
-        elif node.tipo == '=':
-            return self._infer_assignment_type(node, symbol_table)
+        cached = self._infer_cache.get(id(node))
+        if cached is not None and cached[0] is node:
+            return cached[1]
         
-        # Expresiones entre paréntesis o componentes
-        elif node.tipo == 'COMPONENTE' and len(node.hijos) == 1:
+        inferred_type = self._infer_node_type(node, symbol_table)
+        self._infer_cache[id(node)] = (node, inferred_type)
+        return inferred_type
+    
+    def _infer_node_type(self, node, symbol_table=None) -> Optional[TypeInfo]:
+        """Infiere el tipo de un nodo sin consultar la caché (los operandos sí la usan)"""
+        handler = self._infer_dispatch.get(node.tipo)
+        if handler is None:
+            return None
+        return handler(node, symbol_table)
+    
+    def _infer_container_type(self, node, symbol_table=None) -> Optional[TypeInfo]:
+        """Desenvuelve nodos contenedores; con varios hijos devuelve None sin error"""
+        if len(node.hijos) == 1:
             return self.infer_expression_type(node.hijos[0], symbol_table)
-        
         return None
     
+    def _infer_literal_type(self, node, symbol_table=None) -> Optional[TypeInfo]:
+        """Infiere el tipo de un literal"""
+        return _LITERAL_TYPES[node.tipo]
+    
+    def _infer_identifier_type(self, node, symbol_table=None) -> Optional[TypeInfo]:
+        """Infiere el tipo de un identificador (requiere tabla de símbolos)"""
+        if symbol_table:
+            symbol = symbol_table.lookup_variable(node.valor)
+            if symbol:
+                return symbol.type_info
+        return None  # Variable no declarada
+    
+    def _operand_types(self, node, symbol_table=None) -> Tuple[Optional[TypeInfo], Optional[TypeInfo]]:
+        """Infiere los tipos de los dos operandos de un operador binario ((None, None) si faltan)"""
+        hijos = node.hijos
+        if len(hijos) < 2:
+            return None, None
+        return (self.infer_expression_type(hijos[0], symbol_table),
+                self.infer_expression_type(hijos[1], symbol_table))
+    
     def _infer_arithmetic_expression_type(self, node, symbol_table=None) -> Optional[TypeInfo]:
         """Infiere el tipo de expresiones aritméticas"""
-        if len(node.hijos) < 2:
-            return None
-        
-        left_type = self.infer_expression_type(node.hijos[0], symbol_table)
-        right_type = self.infer_expression_type(node.hijos[1], symbol_table)
-        
-        if not left_type or not right_type:
+        left_type, right_type = self._operand_types(node, symbol_table)
+        if left_type is None or right_type is None:
             return None
         
         # Verificar que ambos tipos sean numéricos
@@ -1279,35 +1767,25 @@ class TypeSystem:
     
     def _infer_relational_expression_type(self, node, symbol_table=None) -> Optional[TypeInfo]:
         """Infiere el tipo de expresiones relacionales (siempre boolean)"""
-        if len(node.hijos) < 2:
-            return None
-        
-        left_type = self.infer_expression_type(node.hijos[0], symbol_table)
-        right_type = self.infer_expression_type(node.hijos[1], symbol_table)
-        
-        if not left_type or not right_type:
+        left_type, right_type = self._operand_types(node, symbol_table)
+        if left_type is None or right_type is None:
             return None
         
         # Verificar compatibilidad de tipos para comparación
         if self.check_compatibility(left_type, right_type):
-            return TypeInfo('boolean')
+            return TIPO_BOOLEAN
         
         return None
     
     def _infer_logical_expression_type(self, node, symbol_table=None) -> Optional[TypeInfo]:
         """Infiere el tipo de expresiones lógicas (siempre boolean)"""
-        if len(node.hijos) < 2:
-            return None
-        
-        left_type = self.infer_expression_type(node.hijos[0], symbol_table)
-        right_type = self.infer_expression_type(node.hijos[1], symbol_table)
-        
-        if not left_type or not right_type:
+        left_type, right_type = self._operand_types(node, symbol_table)
+        if left_type is None or right_type is None:
             return None
         
         # Ambos operandos deben ser boolean
         if left_type.base_type == 'boolean' and right_type.base_type == 'boolean':
-            return TypeInfo('boolean')
+            return TIPO_BOOLEAN
         
         return None
     
@@ -1325,43 +1803,47 @@ class TypeSystem:
         Retorna (es_válida, lista_errores)
         """
         errors = []
+        validation_dispatch = self._validation_dispatch
         
-        if not node:
-            return False, ["Nodo de expresión nulo"]
-        
-        # Validar expresiones aritméticas
-        if node.tipo in ['+', '-', '*', '/', '%', '^']:
-            valid, error_msgs = self._validate_arithmetic_expression(node, symbol_table)
-            if not valid:
-                errors.extend(error_msgs)
-        
-        # Validar expresiones relacionales
-        elif node.tipo in ['>', '<', '>=', '<=', '==', '!=']:
-            valid, error_msgs = self._validate_relational_expression(node, symbol_table)
-            if not valid:
-                errors.extend(error_msgs)
-        
-        # Validar expresiones lógicas
-        elif node.tipo in ['&&', '||']:
-            valid, error_msgs = self._validate_logical_expression(node, symbol_table)
-            if not valid:
-                errors.extend(error_msgs)
-        
-        # Validar asignaciones
-        elif node.tipo == '=':
-            valid, error_msgs = self._validate_assignment_expression(node, symbol_table)
-            if not valid:
-                errors.extend(error_msgs)
-        
-        # Validar identificadores
-        elif node.tipo == 'ID':
-            if symbol_table and not symbol_table.is_declared(node.valor):
-                errors.append(f"Variable '{node.valor}' no declarada en línea {node.linea}")
+        # Los subárboles ya validados sin errores (con la misma tabla y dentro
+        # del mismo recorrido) se omiten
+        if self._pass_depth and symbol_table is not None:
+            self._sync_cache_state(symbol_table)
+            validated_clean = self._validated_clean
+        else:
+            validated_clean = {}
+        root = node
+        
+        # Recorrido en preorden con pila explícita: los errores de cada nodo
+        # se agregan a una sola lista, antes que los de sus hijos
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            
+            if not node:
+                errors.append("Nodo de expresión nulo")
+                continue
+            
+            if validated_clean.get(id(node)) is node:
+                continue
+            
+            # Validar operadores y asignaciones
+            validator = validation_dispatch.get(node.tipo)
+            if validator is not None:
+                valid, error_msgs = validator(node, symbol_table)
+                if not valid:
+                    errors.extend(error_msgs)
+            
+            # Validar identificadores
+            elif node.tipo == 'ID':
+                if symbol_table and not symbol_table.is_declared(node.valor):
+                    errors.append(f"Variable '{node.valor}' no declarada en línea {node.linea}")
+            
+            # Validar los hijos (en orden, por eso se apilan invertidos)
+            pending.extend(reversed(node.hijos))
         
-        # Validar recursivamente los hijos
-        for hijo in node.hijos:
-            child_valid, child_errors = self.validate_expression_types(hijo, symbol_table)
-            errors.extend(child_errors)
+        if not errors and root:
+            validated_clean[id(root)] = root
         
         return len(errors) == 0, errors
     
@@ -1373,8 +1855,7 @@ class TypeSystem:
             errors.append(f"Operador aritmético '{node.tipo}' requiere dos operandos en línea {node.linea}")
             return False, errors
         
-        left_type = self.infer_expression_type(node.hijos[0], symbol_table)
-        right_type = self.infer_expression_type(node.hijos[1], symbol_table)
+        left_type, right_type = self._operand_types(node, symbol_table)
         
         if not left_type:
             errors.append(f"No se puede determinar el tipo del operando izquierdo en línea {node.linea}")
@@ -1400,8 +1881,7 @@ class TypeSystem:
             errors.append(f"Operador relacional '{node.tipo}' requiere dos operandos en línea {node.linea}")
             return False, errors
         
-        left_type = self.infer_expression_type(node.hijos[0], symbol_table)
-        right_type = self.infer_expression_type(node.hijos[1], symbol_table)
+        left_type, right_type = self._operand_types(node, symbol_table)
         
         if not left_type:
             errors.append(f"No se puede determinar el tipo del operando izquierdo en línea {node.linea}")
@@ -1423,8 +1903,7 @@ class TypeSystem:
             errors.append(f"Operador lógico '{node.tipo}' requiere dos operandos en línea {node.linea}")
             return False, errors
         
-        left_type = self.infer_expression_type(node.hijos[0], symbol_table)
-        right_type = self.infer_expression_type(node.hijos[1], symbol_table)
+        left_type, right_type = self._operand_types(node, symbol_table)
         
         if not left_type:
             errors.append(f"No se puede determinar el tipo del operando izquierdo en línea {node.linea}")
@@ -1452,7 +1931,7 @@ class TypeSystem:
         left_node = node.hijos[0]
         
         # Desenvolver nodos contenedores
-        while left_node.tipo in ['COMPONENTE', 'EXPRESION_SIMPLE', 'SENT_EXPRESION'] and len(left_node.hijos) == 1:
+        while left_node.tipo in _ASSIGNMENT_TARGET_WRAPPERS and len(left_node.hijos) == 1:
             left_node = left_node.hijos[0]
         
         if left_node.tipo != 'ID':
@@ -1476,10 +1955,10 @@ class TypeSystem:
         return len(errors) == 0, errors
 
 # Constantes para tipos predefinidos
-TIPO_INT = TypeInfo('int')
-TIPO_FLOAT = TypeInfo('float')
-TIPO_VOID = TypeInfo('void')
-TIPO_BOOLEAN = TypeInfo('boolean')
+TIPO_INT = TypeInfo.get('int')
+TIPO_FLOAT = TypeInfo.get('float')
+TIPO_VOID = TypeInfo.get('void')
+TIPO_BOOLEAN = TypeInfo.get('boolean')
 
 # Diccionario de tipos básicos para fácil acceso
 TIPOS_BASICOS = {
@@ -1489,37 +1968,83 @@ TIPOS_BASICOS = {
     'boolean': TIPO_BOOLEAN
 }
 
+# Precalcular las tablas de compatibilidad y promoción para los tipos básicos
+for _tipo_a in TIPOS_BASICOS.values():
+    for _tipo_b in TIPOS_BASICOS.values():
+        _tipo_a.is_compatible_with(_tipo_b)
+        _tipo_a.can_promote_to(_tipo_b)
+del _tipo_a, _tipo_b
+
 def crear_tipo_desde_string(tipo_str: str) -> TypeInfo:
     """Crea un objeto TypeInfo a partir de una cadena de tipo"""
     if tipo_str in TIPOS_BASICOS:
         return TIPOS_BASICOS[tipo_str]
     else:
         # Para tipos no reconocidos, crear un tipo básico
-        return TypeInfo(tipo_str)
+        return TypeInfo.get(tipo_str)
 
 def es_tipo_valido(tipo_str: str) -> bool:
     """Verifica si una cadena representa un tipo válido"""
     return tipo_str in TIPOS_BASICOS
 
+# Formato de cada fila de la tabla de errores (severidad, tipo, descripción, línea, columna)
+_ERROR_ROW_FORMAT = "| %-12s | %-15s | %-50s | %-8s | %-8s |\n"
+# Separador y encabezado fijos de la tabla de errores
+_ERROR_TABLE_SEPARATOR = "=" * 100 + "\n"
+_ERROR_TABLE_HEADER = (
+    "ERRORES SEMÁNTICOS:\n" + _ERROR_TABLE_SEPARATOR +
+    _ERROR_ROW_FORMAT % ("SEVERIDAD", "TIPO", "DESCRIPCIÓN", "LÍNEA", "COLUMNA") +
+    _ERROR_TABLE_SEPARATOR
+)
+
+# Tipos de error contabilizados por ErrorReporter (cualquier otro cuenta como 'other')
+_ERROR_COUNT_TYPES = (
+    'undeclared_variable',
+    'duplicate_declaration',
+    'type_incompatibility',
+    'invalid_conversion',
+    'operator_misuse',
+    'other'
+)
+
+# Subrayado de las secciones de los reportes de resultados
+_REPORT_SECTION_RULE = "-" * 40 + "\n"
+
 class ErrorReporter:
     """Maneja la detección, recolección y formateo de errores semánticos"""
     
-    def __init__(self):
-        """Inicializa el reportador de errores"""
+    def __init__(self, max_issues: Optional[int] = None):
+        """
+        Inicializa el reportador de errores
+        
+        Args:
+            max_issues: Máximo opcional de errores y de advertencias que se
+                        conservan; los siguientes sólo se contabilizan como
+                        omitidos. None (por defecto) conserva todos
+        """
         self.errors = []  # Lista de errores semánticos
         self.warnings = []  # Lista de advertencias
-        self.error_counts = {
-            'undeclared_variable': 0,
-            'duplicate_declaration': 0,
-            'type_incompatibility': 0,
-            'invalid_conversion': 0,
-            'operator_misuse': 0,
-            'other': 0
-        }
+        self.max_issues = max_issues
+        self._dropped_errors = 0
+        self._dropped_warnings = 0
+        self.error_counts = dict.fromkeys(_ERROR_COUNT_TYPES, 0)
 
         self._reported_errors = set()
+        
+        # Lista destino por severidad (cualquier otra severidad va a advertencias)
+        self._issues_by_severity = {'error': self.errors}
+        
+        # Primer error/advertencia por (línea, columna), mantenidos al agregar,
+        # con su posición en la lista y cuántos elementos pasaron por add_error
+        self._top_error = None
+        self._top_warning = None
+        self._top_error_index = 0
+        self._top_warning_index = 0
+        self._tracked_errors = 0
+        self._tracked_warnings = 0
     
-    def add_error(self, error_type: str, message: str, line: int, column: int, severity: str = 'error'):
+    def add_error(self, error_type: str, message: str, line: int, column: int, severity: str = 'error',
+                  symbol_name: Optional[str] = None):
         """
         Agrega un error o advertencia al reporte
         
@@ -1529,6 +2054,7 @@ class ErrorReporter:
             line: Número de línea donde ocurre el error
             column: Número de columna donde ocurre el error
             severity: Severidad del error ('error' o 'warning')
+            symbol_name: Variable a la que se refiere el error (opcional)
         """
 
         # Crear una clave única para el error
@@ -1538,31 +2064,46 @@ class ErrorReporter:
         if error_key in self._reported_errors:
             return
         
-        self._reported_errors.add(error_key)
-
-        semantic_error = SemanticError(
-            error_type=error_type,
-            message=message,
-            line=line,
-            column=column,
-            severity=severity
-        )
+        # La clave se guarda aunque el problema se omita por el límite, para que
+        # un duplicado omitido no se cuente de nuevo
+        self._reported_errors.add(error_key)
+        
+        issues = self._issues_by_severity.get(severity, self.warnings)
+        error_counts = self.error_counts
+        
+        # Límite opcional: más allá de él sólo se cuenta el problema
+        if self.max_issues is not None and len(issues) >= self.max_issues:
+            if issues is self.errors:
+                self._dropped_errors += 1
+            else:
+                self._dropped_warnings += 1
+            error_counts[error_type if error_type in error_counts else 'other'] += 1
+            return
+        
+        issue = SemanticError(error_type, message, line, column, severity, symbol_name)
+        issues.append(issue)
         
-        if severity == 'error':
-            self.errors.append(semantic_error)
+        # Mantener el más severo de cada lista (en empate se conserva el primero)
+        if issues is self.errors:
+            self._tracked_errors += 1
+            top = self._top_error
+            if top is None or (line, column) < (top.line, top.column):
+                self._top_error = issue
+                self._top_error_index = len(issues) - 1
         else:
-            self.warnings.append(semantic_error)
+            self._tracked_warnings += 1
+            top = self._top_warning
+            if top is None or (line, column) < (top.line, top.column):
+                self._top_warning = issue
+                self._top_warning_index = len(issues) - 1
         
-        # Actualizar contadores
-        if error_type in self.error_counts:
-            self.error_counts[error_type] += 1
-        else:
-            self.error_counts['other'] += 1
+        # Actualizar contadores (tipos no registrados cuentan como 'other')
+        error_counts[error_type if error_type in error_counts else 'other'] += 1
     
     def add_undeclared_variable_error(self, variable_name: str, line: int, column: int):
         """Agrega un error de variable no declarada"""
         message = f"Variable '{variable_name}' no declarada"
-        self.add_error('undeclared_variable', message, line, column)
+        self.add_error('undeclared_variable', message, line, column, symbol_name=variable_name)
     
     def add_duplicate_declaration_error(self, variable_name: str, line: int, column: int, 
                                       original_line: int = None):
@@ -1571,7 +2112,7 @@ class ErrorReporter:
             message = f"Variable '{variable_name}' ya declarada en línea {original_line}"
         else:
             message = f"Variable '{variable_name}' ya declarada en el ámbito actual"
-        self.add_error('duplicate_declaration', message, line, column)
+        self.add_error('duplicate_declaration', message, line, column, symbol_name=variable_name)
     
     def add_type_incompatibility_error(self, expected_type: str, found_type: str, 
                                      line: int, column: int, context: str = ""):
@@ -1632,6 +2173,10 @@ class ErrorReporter:
         """Obtiene el número total de advertencias"""
         return len(self.warnings)
     
+    def get_dropped_count(self) -> int:
+        """Obtiene cuántos errores y advertencias se omitieron por superar max_issues"""
+        return self._dropped_errors + self._dropped_warnings
+    
     def get_error_count_by_type(self, error_type: str) -> int:
         """Obtiene el número de errores de un tipo específico"""
         return self.error_counts.get(error_type, 0)
@@ -1641,31 +2186,61 @@ class ErrorReporter:
         self.errors.clear()
         self.warnings.clear()
         self._reported_errors.clear()
-        for key in self.error_counts:
-            self.error_counts[key] = 0
+        self._top_error = None
+        self._top_warning = None
+        self._top_error_index = 0
+        self._top_warning_index = 0
+        self._tracked_errors = 0
+        self._tracked_warnings = 0
+        self._dropped_errors = 0
+        self._dropped_warnings = 0
+        self.error_counts.update(dict.fromkeys(_ERROR_COUNT_TYPES, 0))
     
     def format_errors(self) -> str:
         """Formatea los errores para mostrar en la GUI"""
-        if not self.has_errors() and not self.has_warnings():
-            return "No se encontraron errores semánticos"
+        return "".join(self.iter_formatted_lines())
+    
+    @classmethod
+    def format_error_list(cls, errors: Iterable[SemanticError]) -> str:
+        """
+        Formatea una lista de errores sin crear un ErrorReporter temporal
         
-        resultado = "ERRORES SEMÁNTICOS:\n"
-        resultado += "=" * 100 + "\n"
-        resultado += "| {:<12} | {:<15} | {:<50} | {:<8} | {:<8} |\n".format(
-            "SEVERIDAD", "TIPO", "DESCRIPCIÓN", "LÍNEA", "COLUMNA"
-        )
-        resultado += "=" * 100 + "\n"
+        Produce el mismo texto que format_errors() de un reportador recién
+        creado al que se le agregaron los errores directamente a self.errors
+        (sin pasar por add_error, por lo que no hay conteo por tipo).
+        
+        Args:
+            errors: Errores semánticos a formatear
+            
+        Returns:
+            Reporte formateado de los errores
+        """
+        errors = list(errors)
+        if not errors:
+            return "No se encontraron errores semánticos"
         
-        # Mostrar errores primero
-        all_issues = sorted(self.get_all_issues(), key=lambda x: (x.line, x.column))
+        partes = list(cls._iter_issue_table(errors))
+        partes.append(f"\nRESUMEN:\n"
+                      f"- Errores: {len(errors)}\n"
+                      f"- Advertencias: 0\n"
+                      f"\nERRORES POR TIPO:\n")
+        return "".join(partes)
+    
+    @staticmethod
+    def _iter_issue_table(issues: List[SemanticError]):
+        """
+        Genera el encabezado, una fila por problema (ordenadas por posición)
+        y el separador final de la tabla de errores
+        """
+        yield _ERROR_TABLE_HEADER
         
-        for issue in all_issues:
+        for issue in sorted(issues, key=lambda x: (x.line, x.column)):
             # Truncar descripción si es muy larga
             descripcion = issue.message
             if len(descripcion) > 48:
                 descripcion = descripcion[:45] + "..."
             
-            resultado += "| {:<12} | {:<15} | {:<50} | {:<8} | {:<8} |\n".format(
+            yield _ERROR_ROW_FORMAT % (
                 issue.severity.upper(),
                 issue.error_type,
                 descripcion,
@@ -1673,21 +2248,35 @@ class ErrorReporter:
                 issue.column
             )
         
-        resultado += "=" * 100 + "\n"
+        yield _ERROR_TABLE_SEPARATOR
+    
+    def iter_formatted_lines(self):
+        """
+        Genera el reporte de format_errors() fragmento a fragmento
+        
+        Returns:
+            Generador de cadenas (encabezado, una fila por problema y resumen)
+        """
+        if not self.has_errors() and not self.has_warnings():
+            yield "No se encontraron errores semánticos"
+            return
+        
+        yield from self._iter_issue_table(self.get_all_issues())
         
         # Agregar resumen
-        resultado += f"\nRESUMEN:\n"
-        resultado += f"- Errores: {self.get_error_count()}\n"
-        resultado += f"- Advertencias: {self.get_warning_count()}\n"
+        yield (f"\nRESUMEN:\n"
+               f"- Errores: {self.get_error_count()}\n"
+               f"- Advertencias: {self.get_warning_count()}\n")
+        if self._dropped_errors or self._dropped_warnings:
+            yield (f"- Omitidos por superar el límite de {self.max_issues}: "
+                   f"{self._dropped_errors} errores, {self._dropped_warnings} advertencias\n")
         
         # Mostrar conteo por tipo si hay errores
         if self.has_errors():
-            resultado += f"\nERRORES POR TIPO:\n"
+            yield "\nERRORES POR TIPO:\n"
             for error_type, count in self.error_counts.items():
                 if count > 0:
-                    resultado += f"- {error_type.replace('_', ' ').title()}: {count}\n"
-        
-        return resultado
+                    yield f"- {error_type.replace('_', ' ').title()}: {count}\n"
     
     def format_for_gui(self) -> Dict[str, Any]:
         """Formatea los errores para la interfaz gráfica"""
@@ -1719,11 +2308,28 @@ class ErrorReporter:
             }
         }
     
+    def format_for_gui_objects(self) -> Dict[str, Any]:
+        """
+        Variante de format_for_gui que entrega los SemanticError sin convertirlos a diccionarios
+        
+        Returns:
+            Diccionario con las listas de errores/advertencias (objetos) y el resumen
+        """
+        return {
+            'errors': list(self.errors),
+            'warnings': list(self.warnings),
+            'summary': {
+                'total_errors': self.get_error_count(),
+                'total_warnings': self.get_warning_count(),
+                'error_counts': self.error_counts.copy()
+            }
+        }
+    
     def export_to_file(self, filename: str):
         """Exporta los errores a un archivo de texto"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(self.format_errors())
+            with open(filename, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
+                f.writelines(self.iter_formatted_lines())
             return True
         except Exception as e:
             print(f"Error al exportar errores a archivo: {e}")
@@ -1731,20 +2337,52 @@ class ErrorReporter:
     
     def get_errors_by_line(self, line_number: int) -> List[SemanticError]:
         """Obtiene todos los errores y advertencias de una línea específica"""
-        return [issue for issue in self.get_all_issues() if issue.line == line_number]
+        return [issue for issues in (self.errors, self.warnings)
+                for issue in issues if issue.line == line_number]
     
     def get_most_severe_error(self) -> Optional[SemanticError]:
         """Obtiene el error más severo (primer error si hay errores, sino primera advertencia)"""
         if self.errors:
-            return min(self.errors, key=lambda x: (x.line, x.column))
+            return self._most_severe_in(self.errors, self._top_error, self._top_error_index,
+                                        self._tracked_errors)
         elif self.warnings:
-            return min(self.warnings, key=lambda x: (x.line, x.column))
+            return self._most_severe_in(self.warnings, self._top_warning, self._top_warning_index,
+                                        self._tracked_warnings)
         return None
     
+    @staticmethod
+    def _most_severe_in(issues: List[SemanticError], top: Optional[SemanticError],
+                        top_index: int, tracked: int) -> SemanticError:
+        """
+        Devuelve el problema mantenido por add_error, o lo recalcula si la lista se modificó directamente
+        
+        Args:
+            issues: Lista de errores o advertencias (no vacía)
+            top: Candidato mantenido al agregar
+            top_index: Posición del candidato en la lista al agregarlo
+            tracked: Cantidad de elementos agregados mediante add_error
+            
+        Returns:
+            Problema con menor (línea, columna); en empate, el primero agregado
+        """
+        # El candidato sólo vale si la lista conserva su tamaño y él sigue en su lugar
+        if top is not None and len(issues) == tracked and issues[top_index] is top:
+            return top
+        return min(issues, key=lambda x: (x.line, x.column))
+    
     def __str__(self) -> str:
         """Representación en cadena del reportador de errores"""
         return self.format_errors()
 
+# Nodos cuyos identificadores descendientes son declaraciones, no usos
+_DECLARATION_CONTEXT_NODE_TYPES = frozenset({'DECLARACION_VARIABLE', 'IDENTIFICADOR'})
+# Estructuras de control que abren un nuevo ámbito
+_SCOPED_CONTROL_NODE_TYPES = frozenset({'SELECCION', 'ITERACION', 'REPETICION'})
+# Prefijo del nombre de ámbito de cada estructura de control (tipo en minúsculas)
+_SCOPE_NAME_PREFIXES = {tipo: tipo.lower() for tipo in _SCOPED_CONTROL_NODE_TYPES}
+# Marcador de pila: cerrar el ámbito abierto por una estructura de control
+_EXIT_SCOPE = object()
+
 class SemanticErrorDetector:
     """Detecta errores semánticos específicos durante el análisis del AST"""
     
@@ -1760,6 +2398,39 @@ class SemanticErrorDetector:
         self.error_reporter = error_reporter
         self.symbol_table = symbol_table
         self.type_system = type_system
+        
+        # Verificación de compatibilidad por tipo de nodo
+        self._compatibility_checks = {'=': self._check_assignment_compatibility}
+        for operator in _ARITHMETIC_OPERATORS:
+            self._compatibility_checks[operator] = self._check_arithmetic_compatibility
+        for operator in _RELATIONAL_OPERATORS:
+            self._compatibility_checks[operator] = self._check_relational_compatibility
+        for operator in _LOGICAL_OPERATORS:
+            self._compatibility_checks[operator] = self._check_logical_compatibility
+    
+    def run_all_checks(self, root) -> bool:
+        """
+        Ejecuta, en orden, la verificación de variables no declaradas, de
+        compatibilidad de tipos y de conversiones inválidas sobre el AST
+        
+        Args:
+            root: Nodo raíz del AST a verificar
+            
+        Returns:
+            True si ninguna verificación encontró errores
+        """
+        # Cada verificación hace su propio recorrido para que los errores se
+        # reporten agrupados por fase; la inferencia de tipos se comparte
+        # entre fases a través de la caché del sistema de tipos
+        type_system = self.type_system
+        type_system.begin_pass()
+        try:
+            undeclared_ok = self.check_undeclared_variables(root)
+            compatibility_ok = self.check_type_compatibility(root)
+            conversions_ok = self.check_invalid_conversions(root)
+        finally:
+            type_system.end_pass()
+        return undeclared_ok and compatibility_ok and conversions_ok
     
     def check_undeclared_variables(self, node, visited=None):
         """
@@ -1773,24 +2444,31 @@ class SemanticErrorDetector:
             visited = set()
         
         errors_found = False
-        
-        # Crear ID único para el nodo
-        node_id = (id(node), node.tipo, node.valor, node.linea, node.columna)
-        
-        if node_id in visited:
-            return True
-        
-        visited.add(node_id)
-        
-        # Verificar si es un ID
-        if node.tipo == 'ID':
+        symbol_table = self.symbol_table
+        
+        # Recorrido en preorden con pila explícita de (nodo, está_en_declaración).
+        # El contexto de declaración se hereda del padre en lugar de recalcularse
+        # subiendo por la cadena de padres en cada identificador
+        pending = [(node, self._is_in_declaration(node))]
+        while pending:
+            node, in_declaration = pending.pop()
+            
+            # Crear ID único para el nodo
+            node_id = (id(node), node.tipo, node.valor, node.linea, node.columna)
+            
+            if node_id in visited:
+                continue
+            
+            visited.add(node_id)
+            
+            # Verificar si es un ID
             # NO verificar si está en una declaración
-            if not self._is_in_declaration(node):
+            if node.tipo == 'ID' and not in_declaration:
                 # ✅ NUEVO: Guardar el nombre en variable
                 var_name = node.valor
                 
                 # Verificar si está declarada
-                if not self.symbol_table.is_declared(var_name):
+                if not symbol_table.is_declared(var_name):
                     self.error_reporter.add_undeclared_variable_error(
                         var_name, node.linea, node.columna
                     )
@@ -1798,12 +2476,25 @@ class SemanticErrorDetector:
                 else:
                     # ✅ MODIFICADO: Registrar DESPUÉS de verificar (evita registros de variables no declaradas)
                     # IMPORTANTE: Registrar CADA uso (permite múltiples apariciones en la misma línea)
-                    self.symbol_table.record_usage(var_name, node.linea)
-        
-        # Verificar hijos
-        for hijo in node.hijos:
-            if not self.check_undeclared_variables(hijo, visited):
-                errors_found = True
+                    symbol_table.record_usage(var_name, node.linea)
+            
+            # Contexto de declaración para los hijos (el ancestro más cercano decide)
+            if node.tipo in _DECLARATION_CONTEXT_NODE_TYPES:
+                child_in_declaration = True
+            elif node.tipo == '=':
+                child_in_declaration = False  # Es una asignación, no declaración
+            else:
+                child_in_declaration = in_declaration
+            
+            # Verificar hijos (en orden, por eso se apilan invertidos)
+            for hijo in reversed(node.hijos):
+                if not hijo:
+                    continue
+                if hijo.padre is node:
+                    pending.append((hijo, child_in_declaration))
+                else:
+                    # Hijo compartido o reubicado: resolver su contexto por la cadena de padres
+                    pending.append((hijo, self._is_in_declaration(hijo)))
         
         return not errors_found
 
@@ -1811,7 +2502,7 @@ class SemanticErrorDetector:
         """Verifica si un nodo ID está en una declaración"""
         current = node.padre if hasattr(node, 'padre') else None
         while current:
-            if current.tipo in ['DECLARACION_VARIABLE', 'IDENTIFICADOR']:
+            if current.tipo in _DECLARATION_CONTEXT_NODE_TYPES:
                 return True
             if current.tipo == '=':
                 return False  # Es una asignación, no declaración
@@ -1906,35 +2597,23 @@ class SemanticErrorDetector:
         Returns:
             True si no hay errores de tipo, False si se encontraron incompatibilidades
         """
-        if not node:
-            return True
-        
         errors_found = False
+        compatibility_checks = self._compatibility_checks
         
-        # Verificar asignaciones
-        if node.tipo == '=':
-            if not self._check_assignment_compatibility(node):
-                errors_found = True
-        
-        # Verificar operaciones aritméticas
-        elif node.tipo in ['+', '-', '*', '/', '%', '^']:
-            if not self._check_arithmetic_compatibility(node):
-                errors_found = True
-        
-        # Verificar operaciones relacionales
-        elif node.tipo in ['>', '<', '>=', '<=', '==', '!=']:
-            if not self._check_relational_compatibility(node):
-                errors_found = True
-        
-        # Verificar operaciones lógicas
-        elif node.tipo in ['&&', '||']:
-            if not self._check_logical_compatibility(node):
-                errors_found = True
-        
-        # Verificar recursivamente en los hijos
-        for hijo in node.hijos:
-            if not self.check_type_compatibility(hijo):
+        # Recorrido en preorden con pila explícita
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if not node:
+                continue
+            
+            # Verificar asignaciones y operaciones aritméticas, relacionales y lógicas
+            check = compatibility_checks.get(node.tipo)
+            if check is not None and not check(node):
                 errors_found = True
+            
+            # Verificar los hijos (en orden, por eso se apilan invertidos)
+            pending.extend(reversed(node.hijos))
         
         return not errors_found
     
@@ -1984,14 +2663,9 @@ class SemanticErrorDetector:
     
     def _check_arithmetic_compatibility(self, node) -> bool:
         """Verifica la compatibilidad de tipos en operaciones aritméticas"""
-        if len(node.hijos) < 2:
-            return True
-        
-        left_type = self.type_system.infer_expression_type(node.hijos[0], self.symbol_table)
-        right_type = self.type_system.infer_expression_type(node.hijos[1], self.symbol_table)
-        
+        left_type, right_type = self.type_system._operand_types(node, self.symbol_table)
         if not left_type or not right_type:
-            return True  # Los errores de inferencia se manejan en otro lugar
+            return True  # Operandos faltantes o errores de inferencia se manejan en otro lugar
         
         # Verificar que ambos tipos sean numéricos
         if not (left_type.is_numeric() and right_type.is_numeric()):
@@ -2015,14 +2689,9 @@ class SemanticErrorDetector:
     
     def _check_relational_compatibility(self, node) -> bool:
         """Verifica la compatibilidad de tipos en operaciones relacionales"""
-        if len(node.hijos) < 2:
-            return True
-        
-        left_type = self.type_system.infer_expression_type(node.hijos[0], self.symbol_table)
-        right_type = self.type_system.infer_expression_type(node.hijos[1], self.symbol_table)
-        
+        left_type, right_type = self.type_system._operand_types(node, self.symbol_table)
         if not left_type or not right_type:
-            return True  # Los errores de inferencia se manejan en otro lugar
+            return True  # Operandos faltantes o errores de inferencia se manejan en otro lugar
         
         # Verificar compatibilidad para comparación
         if not self.type_system.check_compatibility(left_type, right_type):
@@ -2037,14 +2706,9 @@ class SemanticErrorDetector:
     
     def _check_logical_compatibility(self, node) -> bool:
         """Verifica la compatibilidad de tipos en operaciones lógicas"""
-        if len(node.hijos) < 2:
-            return True
-        
-        left_type = self.type_system.infer_expression_type(node.hijos[0], self.symbol_table)
-        right_type = self.type_system.infer_expression_type(node.hijos[1], self.symbol_table)
-        
+        left_type, right_type = self.type_system._operand_types(node, self.symbol_table)
         if not left_type or not right_type:
-            return True  # Los errores de inferencia se manejan en otro lugar
+            return True  # Operandos faltantes o errores de inferencia se manejan en otro lugar
         
         # Ambos operandos deben ser boolean
         if left_type.base_type != 'boolean':
@@ -2075,35 +2739,39 @@ class SemanticErrorDetector:
         Returns:
             True si no hay conversiones inválidas, False si se encontraron errores
         """
-        if not node:
-            return True
-        
         errors_found = False
-        
-        # Verificar conversiones en asignaciones
-        if node.tipo == '=' and len(node.hijos) >= 2:
-            left_node = node.hijos[0]
-            right_node = node.hijos[1]
-            
-            if left_node.tipo == 'ID':
-                symbol = self.symbol_table.lookup_variable(left_node.valor)
-                if symbol:
-                    right_type = self.type_system.infer_expression_type(right_node, self.symbol_table)
-                    if right_type:
-                        # Verificar si la conversión es válida
-                        if not self.type_system.can_convert(right_type, symbol.type_info):
-                            # Solo reportar si no son compatibles de ninguna manera
-                            if not self.type_system.check_compatibility(right_type, symbol.type_info):
-                                self.error_reporter.add_invalid_conversion_error(
-                                    str(right_type), str(symbol.type_info),
-                                    node.linea, node.columna
-                                )
-                                errors_found = True
-        
-        # Verificar recursivamente en los hijos
-        for hijo in node.hijos:
-            if not self.check_invalid_conversions(hijo):
-                errors_found = True
+        symbol_table = self.symbol_table
+        type_system = self.type_system
+        
+        # Recorrido en preorden con pila explícita
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if not node:
+                continue
+            
+            # Verificar conversiones en asignaciones
+            if node.tipo == '=' and len(node.hijos) >= 2:
+                left_node = node.hijos[0]
+                right_node = node.hijos[1]
+                
+                if left_node.tipo == 'ID':
+                    symbol = symbol_table.lookup_variable(left_node.valor)
+                    if symbol:
+                        right_type = type_system.infer_expression_type(right_node, symbol_table)
+                        if right_type:
+                            # Verificar si la conversión es válida
+                            if not type_system.can_convert(right_type, symbol.type_info):
+                                # Solo reportar si no son compatibles de ninguna manera
+                                if not type_system.check_compatibility(right_type, symbol.type_info):
+                                    self.error_reporter.add_invalid_conversion_error(
+                                        str(right_type), str(symbol.type_info),
+                                        node.linea, node.columna
+                                    )
+                                    errors_found = True
+            
+            # Verificar los hijos (en orden, por eso se apilan invertidos)
+            pending.extend(reversed(node.hijos))
         
         return not errors_found
 
@@ -2137,12 +2805,9 @@ def export_annotated_ast_to_json(annotated_ast: AnnotatedASTNode, filename: str)
         True si se exportó exitosamente, False en caso de error
     """
     try:
-        import json
-        
-        ast_dict = annotated_ast.to_annotated_dict()
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(ast_dict, f, indent=2, ensure_ascii=False)
+        # Escritura por fragmentos: no se materializa el diccionario completo del AST
+        with open(filename, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
+            annotated_ast.write_annotated_json(f.write)
         
         return True
     except Exception as e:
@@ -2161,12 +2826,11 @@ def export_annotated_ast_to_text(annotated_ast: AnnotatedASTNode, filename: str)
         True si se exportó exitosamente, False en caso de error
     """
     try:
-        formatted_content = annotated_ast.to_formatted_string()
-        
-        with open(filename, 'w', encoding='utf-8') as f:
+        with open(filename, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
             f.write("AST ANOTADO CON INFORMACIÓN SEMÁNTICA\n")
             f.write("=" * 50 + "\n\n")
-            f.write(formatted_content)
+            # Escribir línea por línea, sin construir la cadena completa
+            annotated_ast.write_formatted(f.write)
         
         return True
     except Exception as e:
@@ -2194,46 +2858,60 @@ def compare_ast_annotations(ast1: AnnotatedASTNode, ast2: AnnotatedASTNode) -> D
         }
     }
     
-    def compare_nodes(node1: AnnotatedASTNode, node2: AnnotatedASTNode, path: str = "root"):
-        # Verificar estructura básica
+    summary = comparison['summary']
+    differences = comparison['annotation_differences']
+    
+    # Recorrido en preorden con pila explícita de pares (nodo1, nodo2, ruta)
+    pending = [(ast1, ast2, "root")]
+    while pending:
+        node1, node2, path = pending.pop()
+        
+        # Verificar estructura básica (no se desciende en subárboles distintos)
         if node1.tipo != node2.tipo or node1.valor != node2.valor:
             comparison['structure_match'] = False
-            return
+            continue
         
         # Contar nodos anotados
-        if node1.has_semantic_info():
-            comparison['summary']['ast1_annotated_nodes'] += 1
-        if node2.has_semantic_info():
-            comparison['summary']['ast2_annotated_nodes'] += 1
+        has_info1 = node1._has_info
+        has_info2 = node2._has_info
+        if has_info1:
+            summary['ast1_annotated_nodes'] += 1
+        if has_info2:
+            summary['ast2_annotated_nodes'] += 1
         
         # Comparar anotaciones semánticas
-        if node1.has_semantic_info() and node2.has_semantic_info():
-            if (str(node1.semantic_type) == str(node2.semantic_type) and
+        if has_info1 and has_info2:
+            # Los tipos están internados: la identidad evita formatear ambos tipos
+            type1, type2 = node1.semantic_type, node2.semantic_type
+            if ((type1 is type2 or str(type1) == str(type2)) and
                 node1.semantic_value == node2.semantic_value):
-                comparison['summary']['matching_annotations'] += 1
+                summary['matching_annotations'] += 1
             else:
-                comparison['annotation_differences'].append({
+                differences.append({
                     'path': path,
                     'node_type': node1.tipo,
-                    'ast1_type': str(node1.semantic_type) if node1.semantic_type else None,
-                    'ast2_type': str(node2.semantic_type) if node2.semantic_type else None,
+                    'ast1_type': str(type1) if type1 else None,
+                    'ast2_type': str(type2) if type2 else None,
                     'ast1_value': node1.semantic_value,
                     'ast2_value': node2.semantic_value
                 })
-        elif node1.has_semantic_info() != node2.has_semantic_info():
-            comparison['annotation_differences'].append({
+        elif has_info1 != has_info2:
+            differences.append({
                 'path': path,
                 'node_type': node1.tipo,
                 'difference': 'One node has annotations, the other does not'
             })
         
-        # Comparar hijos recursivamente
-        if len(node1.hijos) == len(node2.hijos):
-            for i, (child1, child2) in enumerate(zip(node1.hijos, node2.hijos)):
-                if isinstance(child1, AnnotatedASTNode) and isinstance(child2, AnnotatedASTNode):
-                    compare_nodes(child1, child2, f"{path}.child[{i}]")
+        # Comparar hijos (en orden inverso para respetar el preorden)
+        hijos1, hijos2 = node1.hijos, node2.hijos
+        if len(hijos1) == len(hijos2):
+            all_annotated = node1._children_annotated and node2._children_annotated
+            for i in range(len(hijos1) - 1, -1, -1):
+                child1, child2 = hijos1[i], hijos2[i]
+                if all_annotated or (isinstance(child1, AnnotatedASTNode) and
+                                     isinstance(child2, AnnotatedASTNode)):
+                    pending.append((child1, child2, f"{path}.child[{i}]"))
     
-    compare_nodes(ast1, ast2)
     return comparison
 
 def validate_ast_annotations(annotated_ast: AnnotatedASTNode, 
@@ -2250,31 +2928,46 @@ def validate_ast_annotations(annotated_ast: AnnotatedASTNode,
     """
     errors = []
     
-    def validate_node(node: AnnotatedASTNode, path: str = "root"):
+    def format_path(link) -> str:
+        # Reconstruye "root.child[i].child[j]..." sólo cuando hay un error que reportar
+        indices = []
+        while link is not None:
+            link, i = link
+            indices.append(i)
+        return "root" + "".join(f".child[{i}]" for i in reversed(indices))
+    
+    # Recorrido en preorden con pila explícita; la ruta se guarda como enlace
+    # (ruta_padre, índice) y no se formatea salvo que el nodo tenga errores
+    pending = [(annotated_ast, None)]
+    while pending:
+        node, link = pending.pop()
+        
         # Validar referencias de símbolos
         if node.tipo == 'ID' and node.symbol_ref:
             # Verificar que el símbolo existe en la tabla
             actual_symbol = symbol_table.lookup_variable(node.valor)
             if not actual_symbol:
-                errors.append(f"Nodo en {path}: referencia a símbolo inexistente '{node.valor}'")
+                errors.append(f"Nodo en {format_path(link)}: referencia a símbolo inexistente '{node.valor}'")
             elif actual_symbol != node.symbol_ref:
-                errors.append(f"Nodo en {path}: referencia de símbolo inconsistente para '{node.valor}'")
+                errors.append(f"Nodo en {format_path(link)}: referencia de símbolo inconsistente para '{node.valor}'")
         
         # Validar tipos semánticos
         if node.semantic_type and node.tipo == 'ID' and node.symbol_ref:
-            if str(node.semantic_type) != str(node.symbol_ref.type_info):
-                errors.append(f"Nodo en {path}: tipo semántico inconsistente con símbolo")
+            symbol_type = node.symbol_ref.type_info
+            if node.semantic_type is not symbol_type and str(node.semantic_type) != str(symbol_type):
+                errors.append(f"Nodo en {format_path(link)}: tipo semántico inconsistente con símbolo")
         
         # Validar valores constantes
         if node.is_constant and node.semantic_value is None:
-            errors.append(f"Nodo en {path}: marcado como constante pero sin valor semántico")
+            errors.append(f"Nodo en {format_path(link)}: marcado como constante pero sin valor semántico")
         
-        # Validar hijos recursivamente
-        for i, hijo in enumerate(node.hijos):
+        # Validar hijos (en orden inverso para respetar el preorden)
+        hijos = node.hijos
+        for i in range(len(hijos) - 1, -1, -1):
+            hijo = hijos[i]
             if isinstance(hijo, AnnotatedASTNode):
-                validate_node(hijo, f"{path}.child[{i}]")
+                pending.append((hijo, (link, i)))
     
-    validate_node(annotated_ast)
     return errors
 
 def get_annotation_statistics(annotated_ast: AnnotatedASTNode) -> Dict[str, Any]:
@@ -2287,55 +2980,56 @@ def get_annotation_statistics(annotated_ast: AnnotatedASTNode) -> Dict[str, Any]
     Returns:
         Diccionario con estadísticas de anotación
     """
-    stats = {
-        'total_nodes': 0,
-        'annotated_nodes': 0,
-        'nodes_with_type': 0,
-        'nodes_with_value': 0,
-        'nodes_with_symbol_ref': 0,
-        'constant_nodes': 0,
-        'lvalue_nodes': 0,
-        'types_distribution': {},
-        'node_types_distribution': {}
-    }
+    total = annotated = with_type = with_value = with_symbol = constants = lvalues = 0
+    # Tipos de nodo y tipos semánticos vistos; se cuentan al final con Counter (en C)
+    node_tipos = []
+    type_strs = []
+    add_tipo, add_type = node_tipos.append, type_strs.append
     
-    def analyze_node(node: AnnotatedASTNode):
-        stats['total_nodes'] += 1
+    # Recorrido en preorden con pila explícita (mismo orden de inserción que la versión recursiva)
+    stack = [annotated_ast]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        node = pop()
+        total += 1
         
-        # Contar distribución de tipos de nodo
-        if node.tipo not in stats['node_types_distribution']:
-            stats['node_types_distribution'][node.tipo] = 0
-        stats['node_types_distribution'][node.tipo] += 1
+        add_tipo(node.tipo)
         
         # Analizar anotaciones semánticas
-        if node.has_semantic_info():
-            stats['annotated_nodes'] += 1
+        if node._has_info:
+            annotated += 1
         
-        if node.semantic_type:
-            stats['nodes_with_type'] += 1
-            type_str = str(node.semantic_type)
-            if type_str not in stats['types_distribution']:
-                stats['types_distribution'][type_str] = 0
-            stats['types_distribution'][type_str] += 1
+        semantic_type = node.semantic_type
+        if semantic_type:
+            with_type += 1
+            add_type(str(semantic_type))
         
         if node.semantic_value is not None:
-            stats['nodes_with_value'] += 1
+            with_value += 1
         
         if node.symbol_ref:
-            stats['nodes_with_symbol_ref'] += 1
+            with_symbol += 1
         
         if node.is_constant:
-            stats['constant_nodes'] += 1
+            constants += 1
         
         if node.is_lvalue:
-            stats['lvalue_nodes'] += 1
+            lvalues += 1
         
-        # Analizar hijos recursivamente
-        for hijo in node.hijos:
-            if isinstance(hijo, AnnotatedASTNode):
-                analyze_node(hijo)
+        extend(reversed(node.annotated_children()))
     
-    analyze_node(annotated_ast)
+    stats = {
+        'total_nodes': total,
+        'annotated_nodes': annotated,
+        'nodes_with_type': with_type,
+        'nodes_with_value': with_value,
+        'nodes_with_symbol_ref': with_symbol,
+        'constant_nodes': constants,
+        'lvalue_nodes': lvalues,
+        # Distribuciones como dict simple (orden de primera aparición)
+        'types_distribution': dict(Counter(type_strs)),
+        'node_types_distribution': dict(Counter(node_tipos))
+    }
     
     # Calcular porcentajes
     if stats['total_nodes'] > 0:
@@ -2347,6 +3041,74 @@ def get_annotation_statistics(annotated_ast: AnnotatedASTNode) -> Dict[str, Any]
     
     return stats
 
+# Plegado de constantes para operadores aritméticos.
+# Cada función recibe ambos operandos y si los dos son enteros; retorna None si
+# la operación no puede evaluarse en tiempo de compilación.
+
+def _fold_add(left, right, both_int):
+    result = left + right
+    # Si ambos son int, mantener como int
+    return int(result) if both_int else result
+
+def _fold_subtract(left, right, both_int):
+    result = left - right
+    return int(result) if both_int else result
+
+def _fold_multiply(left, right, both_int):
+    result = left * right
+    return int(result) if both_int else result
+
+def _fold_divide(left, right, both_int):
+    if right == 0:
+        return None  # División por cero
+    # REGLA DE DIVISIÓN:
+    # int / int = división entera (resultado int): 1/3 = 0, 7/2 = 3
+    # float involucrado = división flotante (resultado float): 7.5/2 = 3.75
+    if both_int:
+        return int(left // right)
+    return float(left / right)
+
+def _fold_modulo(left, right, both_int):
+    if right != 0 and both_int:
+        return int(left % right)
+    return None
+
+def _fold_power(left, right, both_int):
+    result = left ** right
+    # Si ambos son int y exponente >= 0, mantener como int
+    if both_int and right >= 0:
+        return int(result)
+    return result
+
+_CONSTANT_FOLDERS = {
+    '+': _fold_add,
+    '-': _fold_subtract,
+    '*': _fold_multiply,
+    '/': _fold_divide,
+    '%': _fold_modulo,
+    '^': _fold_power,
+}
+
+def _fold_constant_operation(operator: str, left_value, right_value):
+    """
+    Evalúa una operación aritmética entre dos valores constantes
+    
+    Returns:
+        El valor calculado o None si no se puede calcular
+    """
+    folder = _CONSTANT_FOLDERS.get(operator)
+    if folder is None:
+        return None
+    
+    # Determinar si los operandos son enteros o flotantes
+    both_int = (isinstance(left_value, int) and not isinstance(left_value, bool) and
+                isinstance(right_value, int) and not isinstance(right_value, bool))
+    
+    try:
+        return folder(left_value, right_value, both_int)
+    except (ValueError, TypeError, ZeroDivisionError, OverflowError):
+        return None
+
 class SemanticVisitor:
     """
     Implementa el patrón visitor para recorrer y procesar nodos del AST
@@ -2366,6 +3128,33 @@ class SemanticVisitor:
         self.type_system = type_system
         self.error_reporter = error_reporter
         self.error_detector = SemanticErrorDetector(error_reporter, symbol_table, type_system)
+        
+        # Método de visita por tipo de nodo; los tipos no listados se resuelven
+        # una sola vez en _visit_method ('=' y los relacionales caen en visit_generic)
+        self._visit_dispatch = dict.fromkeys(_ARITHMETIC_OPERATORS, self.visit_operador_aritmetico)
+        self._visit_dispatch.update({
+            'DECLARACION_VARIABLE': self.visit_declaracion_variable,
+            'ID': self.visit_id,
+            'NUM_INT': self.visit_num_int,
+            'NUM_FLOAT': self.visit_num_float,
+            'BOOLEANO': self.visit_booleano,
+        })
+    
+    def _visit_method(self, tipo: str):
+        """
+        Obtiene el método visit_<tipo> para un tipo de nodo (o visit_generic si no existe)
+        
+        Args:
+            tipo: Tipo del nodo
+            
+        Returns:
+            Método ligado que procesa el nodo anotado
+        """
+        method = self._visit_dispatch.get(tipo)
+        if method is None:
+            method = getattr(self, f'visit_{tipo.lower()}', self.visit_generic)
+            self._visit_dispatch[tipo] = method
+        return method
     
     def visit(self, node) -> AnnotatedASTNode:
         """
@@ -2380,36 +3169,42 @@ class SemanticVisitor:
         if not node:
             return None
         
-        # Crear nodo anotado
-        annotated_node = AnnotatedASTNode.from_node(node)
-        
-        # Visitar hijos recursivamente PRIMERO (para cálculo bottom-up)
-        annotated_children = []
-        for hijo in node.hijos:
-            annotated_child = self.visit(hijo)
-            if annotated_child:
-                annotated_children.append(annotated_child)
-        
-        annotated_node.hijos = annotated_children
-        
-        # Actualizar referencias padre
-        for hijo in annotated_node.hijos:
-            hijo.padre = annotated_node
-        
-        # Procesar según el tipo de nodo DESPUÉS de procesar hijos
-        method_name = f'visit_{node.tipo.lower()}'
-        
-        # Para operadores aritméticos, usar un método específico
-        if node.tipo in ['+', '-', '*', '/', '%', '^']:
-            self.visit_operador_aritmetico(annotated_node)
-        elif hasattr(self, method_name):
-            method = getattr(self, method_name)
+        # Recorrido en postorden con pila explícita: los hijos se visitan PRIMERO
+        # (de izquierda a derecha, para cálculo bottom-up) y sus versiones anotadas
+        # se acumulan en 'results' hasta que el padre las recoge
+        results = []
+        dispatch = self._visit_dispatch
+        stack = [(node, None, 0)]
+        while stack:
+            current, annotated_node, child_count = stack.pop()
+            if annotated_node is None:
+                # Crear nodo anotado y programar la visita de sus hijos
+                hijos = [hijo for hijo in current.hijos if hijo]
+                stack.append((current, AnnotatedASTNode.from_node(current), len(hijos)))
+                stack.extend((hijo, None, 0) for hijo in reversed(hijos))
+                continue
+            
+            if child_count:
+                annotated_children = results[-child_count:]
+                del results[-child_count:]
+            else:
+                annotated_children = []
+            
+            annotated_node.hijos = annotated_children
+            annotated_node._children_annotated = True
+            
+            # Actualizar referencias padre
+            for hijo in annotated_children:
+                hijo.padre = annotated_node
+            
+            # Procesar según el tipo de nodo DESPUÉS de procesar hijos
+            method = dispatch.get(current.tipo)
+            if method is None:
+                method = self._visit_method(current.tipo)
             method(annotated_node)
-        else:
-            # Procesamiento genérico
-            self.visit_generic(annotated_node)
+            results.append(annotated_node)
         
-        return annotated_node
+        return results[0]
     
     def visit_generic(self, node: AnnotatedASTNode):
         """Procesamiento genérico para nodos no especializados"""
@@ -2439,7 +3234,7 @@ class SemanticVisitor:
     
     def visit_num_int(self, node: AnnotatedASTNode):
         """Procesa números enteros"""
-        node.set_semantic_type(TypeInfo('int'))
+        node.set_semantic_type(TIPO_INT)
         try:
             node.set_semantic_value(int(node.valor))
             node.is_constant = True
@@ -2448,7 +3243,7 @@ class SemanticVisitor:
     
     def visit_num_float(self, node: AnnotatedASTNode):
         """Procesa números flotantes"""
-        node.set_semantic_type(TypeInfo('float'))
+        node.set_semantic_type(TIPO_FLOAT)
         try:
             node.set_semantic_value(float(node.valor))
             node.is_constant = True
@@ -2457,8 +3252,8 @@ class SemanticVisitor:
     
     def visit_booleano(self, node: AnnotatedASTNode):
         """Procesa valores booleanos"""
-        node.set_semantic_type(TypeInfo('boolean'))
-        node.set_semantic_value(node.valor.lower() == 'true')
+        node.set_semantic_type(TIPO_BOOLEAN)
+        node.set_semantic_value(_parse_boolean_literal(node.valor))
         node.is_constant = True
     
     def visit_asignacion(self, node: AnnotatedASTNode):
@@ -2477,36 +3272,31 @@ class SemanticVisitor:
         # Verificar compatibilidad de operandos
         self.error_detector.check_type_compatibility(node)
         
-        # Calcular tipo resultado
-        if len(node.hijos) >= 2:
-            left_type = self.type_system.infer_expression_type(node.hijos[0], self.symbol_table)
-            right_type = self.type_system.infer_expression_type(node.hijos[1], self.symbol_table)
-            
-            if left_type and right_type:
-                result_type = self.type_system.get_operation_result_type(node.tipo, left_type, right_type)
-                if result_type:
-                    node.set_semantic_type(result_type)
-                    
-                # Calcular el valor de la operación si es posible
-                result_value = self._calculate_operation_value(node)
-                if result_value is not None:
-                    node.set_semantic_value(result_value)
+        # Calcular tipo resultado (los operadores unarios tienen un solo hijo
+        # y _operand_types devuelve (None, None) para ellos)
+        type_system = self.type_system
+        left_type, right_type = type_system._operand_types(node, self.symbol_table)
+        
+        if left_type is not None and right_type is not None:
+            result_type = type_system.get_operation_result_type(node.tipo, left_type, right_type)
+            if result_type:
+                node.set_semantic_type(result_type)
+                
+            # Calcular el valor de la operación si es posible
+            result_value = self._calculate_operation_value(node)
+            if result_value is not None:
+                node.set_semantic_value(result_value)
     
     def visit_operador_relacional(self, node: AnnotatedASTNode):
-        """Procesa operadores relacionales (>, <, >=, <=, ==, !=)"""
+        """Procesa operadores relacionales (>, <, >=, <=, ==, !=) y lógicos (&&, ||)"""
         # Verificar compatibilidad de operandos
         self.error_detector.check_type_compatibility(node)
         
-        # Los operadores relacionales siempre retornan boolean
-        node.set_semantic_type(TypeInfo('boolean'))
+        # Los operadores relacionales y lógicos siempre retornan boolean
+        node.set_semantic_type(TIPO_BOOLEAN)
     
-    def visit_operador_logico(self, node: AnnotatedASTNode):
-        """Procesa operadores lógicos (&&, ||)"""
-        # Verificar que los operandos sean boolean
-        self.error_detector.check_type_compatibility(node)
-        
-        # Los operadores lógicos siempre retornan boolean
-        node.set_semantic_type(TypeInfo('boolean'))
+    # Los operadores lógicos se procesan igual que los relacionales
+    visit_operador_logico = visit_operador_relacional
     
     def _calculate_operation_value(self, node: AnnotatedASTNode):
         """
@@ -2520,7 +3310,7 @@ class SemanticVisitor:
         Returns:
             El valor calculado o None si no se puede calcular
         """
-        if node.tipo not in ['+', '-', '*', '/', '%', '^']:
+        if node.tipo not in _CONSTANT_FOLDERS:
             return None
             
         if len(node.hijos) < 2:
@@ -2533,63 +3323,7 @@ class SemanticVisitor:
         if left_value is None or right_value is None:
             return None
         
-        # Determinar si los operandos son enteros o flotantes
-        left_is_int = isinstance(left_value, int) and not isinstance(left_value, bool)
-        right_is_int = isinstance(right_value, int) and not isinstance(right_value, bool)
-        
-        try:
-            if node.tipo == '+':
-                result = left_value + right_value
-                # Si ambos son int, mantener como int
-                if left_is_int and right_is_int:
-                    return int(result)
-                return result
-                
-            elif node.tipo == '-':
-                result = left_value - right_value
-                # Si ambos son int, mantener como int
-                if left_is_int and right_is_int:
-                    return int(result)
-                return result
-                
-            elif node.tipo == '*':
-                result = left_value * right_value
-                # Si ambos son int, mantener como int
-                if left_is_int and right_is_int:
-                    return int(result)
-                return result
-                
-            elif node.tipo == '/':
-                if right_value != 0:
-                    # REGLA DE DIVISIÓN:
-                    # int / int = división entera (resultado int)
-                    # float involucrado = división flotante (resultado float)
-                    if left_is_int and right_is_int:
-                        # División entera: 1/3 = 0, 7/2 = 3, 10/4 = 2
-                        return int(left_value // right_value)
-                    else:
-                        # División flotante: 1.0/3 = 0.333..., 7.5/2 = 3.75
-                        return float(left_value / right_value)
-                else:
-                    return None  # División por cero
-                    
-            elif node.tipo == '%':
-                if right_value != 0 and left_is_int and right_is_int:
-                    return int(left_value % right_value)
-                else:
-                    return None
-                    
-            elif node.tipo == '^':
-                result = left_value ** right_value
-                # Si ambos son int y exponente >= 0, mantener como int
-                if left_is_int and right_is_int and right_value >= 0:
-                    return int(result)
-                return result
-                
-        except (ValueError, TypeError, ZeroDivisionError, OverflowError):
-            return None
-        
-        return None
+        return _fold_constant_operation(node.tipo, left_value, right_value)
     
     def _get_node_value(self, node):
         """
@@ -2631,7 +3365,7 @@ class SemanticVisitor:
             return None
         
         # Si es una operación, calcularla recursivamente
-        elif node.tipo in ['+', '-', '*', '/', '%', '^']:
+        elif node.tipo in _ARITHMETIC_OPERATORS:
             if isinstance(node, AnnotatedASTNode):
                 calculated = self._calculate_operation_value(node)
                 if calculated is not None and hasattr(node, 'set_semantic_value'):
@@ -2672,6 +3406,10 @@ class SemanticVisitor:
         
         # El procesamiento de hijos se hace automáticamente
 
+# Cantidad de errores a partir de la cual perform_comprehensive_check deja de
+# ejecutar las fases restantes (la entrada ya está demasiado dañada)
+_MAX_ERRORS_FOR_CONTINUATION = 50
+
 class SemanticAnalyzer:
     """
     Analizador semántico principal que orquesta todos los componentes
@@ -2725,15 +3463,9 @@ class SemanticAnalyzer:
             # IMPORTANTE: Solo llamar UNA VEZ
             self._build_symbol_table(self.ast)
             
-            # Fase 2: Verificación de variables no declaradas
-            # Llamar UNA SOLA VEZ
-            self.error_detector.check_undeclared_variables(self.ast)
-            
-            # Fase 3: Verificación de compatibilidad de tipos
-            self.error_detector.check_type_compatibility(self.ast)
-            
-            # Fase 4: Verificación de conversiones inválidas
-            self.error_detector.check_invalid_conversions(self.ast)
+            # Fases 2 a 4: variables no declaradas (UNA SOLA VEZ), compatibilidad
+            # de tipos y conversiones inválidas
+            self.error_detector.run_all_checks(self.ast)
             
             # Fase 5: Anotación del AST
             # Generar AST anotado una sola vez usando el anotador
@@ -2759,27 +3491,33 @@ class SemanticAnalyzer:
         Args:
             node: Nodo del AST a procesar
         """
-        if not node:
-            return
-        
-        # Procesar declaraciones de variables
-        if node.tipo == 'DECLARACION_VARIABLE':
-            # Solo verificar duplicados, NO variables no declaradas
-            self.error_detector.check_duplicate_declarations(node)
-        
-        # Procesar estructuras de control
-        elif node.tipo in ['SELECCION', 'ITERACION', 'REPETICION']:
-            scope_name = f"{node.tipo.lower()}_{node.linea}"
-            self.symbol_table.enter_scope(scope_name)
+        symbol_table = self.symbol_table
+        
+        # Recorrido en preorden con pila explícita; _EXIT_SCOPE cierra el ámbito
+        # de una estructura de control después de procesar todos sus hijos
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if node is _EXIT_SCOPE:
+                symbol_table.exit_scope()
+                continue
+            if not node:
+                continue
+            
+            # Procesar declaraciones de variables
+            if node.tipo == 'DECLARACION_VARIABLE':
+                # Solo verificar duplicados, NO variables no declaradas
+                self.error_detector.check_duplicate_declarations(node)
+                continue
             
-            for hijo in node.hijos:
-                self._build_symbol_table(hijo)
+            # Procesar estructuras de control
+            if node.tipo in _SCOPED_CONTROL_NODE_TYPES:
+                scope_name = f"{_SCOPE_NAME_PREFIXES[node.tipo]}_{node.linea}"
+                symbol_table.enter_scope(scope_name)
+                pending.append(_EXIT_SCOPE)
             
-            self.symbol_table.exit_scope()
-        else:
-            # Procesar hijos
-            for hijo in node.hijos:
-                self._build_symbol_table(hijo)
+            # Procesar hijos (en orden, por eso se apilan invertidos)
+            pending.extend(reversed(node.hijos))
     
     def get_symbol_table(self) -> SymbolTable:
         """Obtiene la tabla de símbolos construida"""
@@ -2815,38 +3553,35 @@ class SemanticAnalyzer:
         if not self.analysis_completed:
             return "Análisis semántico no completado"
         
-        resultado = "RESULTADOS DEL ANÁLISIS SEMÁNTICO\n"
-        resultado += "=" * 60 + "\n\n"
+        partes = ["RESULTADOS DEL ANÁLISIS SEMÁNTICO\n", "=" * 60 + "\n\n"]
+        append = partes.append
         
         # Información general
-        resultado += f"Estado del análisis: {'Completado' if self.analysis_completed else 'Incompleto'}\n"
-        resultado += f"Errores encontrados: {self.error_reporter.get_error_count()}\n"
-        resultado += f"Advertencias encontradas: {self.error_reporter.get_warning_count()}\n"
-        resultado += f"Variables declaradas: {len(self.symbol_table.get_all_symbols())}\n\n"
+        append(f"Estado del análisis: {'Completado' if self.analysis_completed else 'Incompleto'}\n"
+               f"Errores encontrados: {self.error_reporter.get_error_count()}\n"
+               f"Advertencias encontradas: {self.error_reporter.get_warning_count()}\n"
+               f"Variables declaradas: {self.symbol_table.get_symbol_count()}\n\n")
         
         # Tabla de símbolos
-        resultado += "TABLA DE SÍMBOLOS:\n"
-        resultado += "-" * 40 + "\n"
-        resultado += self.symbol_table.to_formatted_table() + "\n"
+        append("TABLA DE SÍMBOLOS:\n" + _REPORT_SECTION_RULE)
+        append(self.symbol_table.to_formatted_table() + "\n")
         
         # Errores y advertencias
         if self.error_reporter.has_errors() or self.error_reporter.has_warnings():
-            resultado += "\nERRORES Y ADVERTENCIAS:\n"
-            resultado += "-" * 40 + "\n"
-            resultado += self.error_reporter.format_errors() + "\n"
+            append("\nERRORES Y ADVERTENCIAS:\n" + _REPORT_SECTION_RULE)
+            append(self.error_reporter.format_errors() + "\n")
         
         # Estadísticas del AST anotado
         if self.annotated_ast:
             stats = get_annotation_statistics(self.annotated_ast)
-            resultado += "\nESTADÍSTICAS DEL AST ANOTADO:\n"
-            resultado += "-" * 40 + "\n"
-            resultado += f"Total de nodos: {stats['total_nodes']}\n"
-            resultado += f"Nodos anotados: {stats['annotated_nodes']} ({stats['annotation_percentage']:.1f}%)\n"
-            resultado += f"Nodos con tipo: {stats['nodes_with_type']}\n"
-            resultado += f"Nodos con valor: {stats['nodes_with_value']}\n"
-            resultado += f"Referencias de símbolos: {stats['nodes_with_symbol_ref']}\n"
+            append("\nESTADÍSTICAS DEL AST ANOTADO:\n" + _REPORT_SECTION_RULE)
+            append(f"Total de nodos: {stats['total_nodes']}\n"
+                   f"Nodos anotados: {stats['annotated_nodes']} ({stats['annotation_percentage']:.1f}%)\n"
+                   f"Nodos con tipo: {stats['nodes_with_type']}\n"
+                   f"Nodos con valor: {stats['nodes_with_value']}\n"
+                   f"Referencias de símbolos: {stats['nodes_with_symbol_ref']}\n")
         
-        return resultado
+        return "".join(partes)
     
     def export_results(self, base_filename: str = "semantic_analysis") -> Dict[str, bool]:
         """
@@ -2863,7 +3598,7 @@ class SemanticAnalyzer:
         try:
             # Exportar tabla de símbolos
             symbol_table_file = f"{base_filename}_symbol_table.txt"
-            with open(symbol_table_file, 'w', encoding='utf-8') as f:
+            with open(symbol_table_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
                 f.write(self.symbol_table.to_formatted_table())
             export_status['symbol_table'] = True
         except Exception as e:
@@ -2873,8 +3608,8 @@ class SemanticAnalyzer:
         try:
             # Exportar errores
             errors_file = f"{base_filename}_errors.txt"
-            with open(errors_file, 'w', encoding='utf-8') as f:
-                f.write(self.error_reporter.format_errors())
+            with open(errors_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
+                f.writelines(self.error_reporter.iter_formatted_lines())
             export_status['errors'] = True
         except Exception as e:
             print(f"Error exportando errores: {e}")
@@ -2884,8 +3619,8 @@ class SemanticAnalyzer:
             # Exportar AST anotado
             if self.annotated_ast:
                 ast_file = f"{base_filename}_annotated_ast.txt"
-                with open(ast_file, 'w', encoding='utf-8') as f:
-                    f.write(self.annotated_ast.to_formatted_string())
+                with open(ast_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
+                    self.annotated_ast.write_formatted(f.write)
                 export_status['annotated_ast'] = True
             else:
                 export_status['annotated_ast'] = False
@@ -2896,7 +3631,7 @@ class SemanticAnalyzer:
         try:
             # Exportar resumen completo
             summary_file = f"{base_filename}_summary.txt"
-            with open(summary_file, 'w', encoding='utf-8') as f:
+            with open(summary_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
                 f.write(self.format_results())
             export_status['summary'] = True
         except Exception as e:
@@ -2934,7 +3669,7 @@ class SemanticAnalyzer:
             'has_warnings': self.has_warnings(),
             'error_count': self.error_reporter.get_error_count(),
             'warning_count': self.error_reporter.get_warning_count(),
-            'symbol_count': len(self.symbol_table.get_all_symbols()),
+            'symbol_count': self.symbol_table.get_symbol_count(),
             'scopes': self.symbol_table.scopes.copy(),
             'current_scope': self.symbol_table.get_current_scope()
         }
@@ -2964,10 +3699,14 @@ class SemanticAnalyzer:
             validation_errors.extend(ast_errors)
         
         # Verificar que todos los símbolos referenciados existan
-        for error in self.error_reporter.get_errors():
+        # Solo lectura: se recorre la lista del reportador sin copiarla
+        for error in self.error_reporter.errors:
             if error.error_type == 'undeclared_variable':
-                # Verificar que efectivamente no esté declarada
-                var_name = error.message.split("'")[1] if "'" in error.message else ""
+                # Verificar que efectivamente no esté declarada (los errores agregados
+                # sin add_undeclared_variable_error no traen el nombre estructurado)
+                var_name = error.symbol_name
+                if var_name is None:
+                    var_name = error.message.split("'")[1] if "'" in error.message else ""
                 if var_name and self.symbol_table.is_declared(var_name):
                     validation_errors.append(f"Inconsistencia: variable '{var_name}' reportada como no declarada pero existe en tabla de símbolos")
         
@@ -2987,51 +3726,58 @@ class SemanticAnalyzer:
             return True
         
         all_checks_passed = True
+        detector = self.error_detector
         
         # 1. Verificar declaraciones duplicadas y construir tabla de símbolos
-        all_checks_passed &= self._process_declarations(ast_root)
-        
         # 2. Verificar variables no declaradas
-        all_checks_passed &= self.check_undeclared_variables(ast_root)
-        
         # 3. Verificar compatibilidad de tipos
-        all_checks_passed &= self.check_type_compatibility(ast_root)
-        
         # 4. Verificar conversiones inválidas
-        all_checks_passed &= self.check_invalid_conversions(ast_root)
+        # Si una fase deja demasiados errores, las siguientes no se ejecutan
+        self.type_system.begin_pass()
+        try:
+            for check in (self._process_declarations, detector.check_undeclared_variables,
+                          detector.check_type_compatibility, detector.check_invalid_conversions):
+                if not check(ast_root):
+                    all_checks_passed = False
+                if self.error_reporter.get_error_count() > _MAX_ERRORS_FOR_CONTINUATION:
+                    return False
+        finally:
+            self.type_system.end_pass()
         
         return all_checks_passed
     
     def _process_declarations(self, node) -> bool:
         """Procesa todas las declaraciones en el AST y verifica duplicados"""
-        if not node:
-            return True
-        
         errors_found = False
-        
-        # Si es una declaración de variable, verificar duplicados
-        if node.tipo == 'DECLARACION_VARIABLE':
-            if not self.check_duplicate_declarations(node):
-                errors_found = True
-        
-        # Procesar estructuras de control que crean nuevos ámbitos
-        elif node.tipo in ['SELECCION', 'ITERACION', 'REPETICION']:
-            # Entrar a un nuevo ámbito
-            scope_name = f"{node.tipo.lower()}_{node.linea}"
-            self.symbol_table.enter_scope(scope_name)
+        symbol_table = self.symbol_table
+        
+        # Recorrido en preorden con pila explícita; _EXIT_SCOPE cierra el ámbito
+        # de una estructura de control después de procesar todos sus hijos
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if node is _EXIT_SCOPE:
+                # Salir del ámbito
+                symbol_table.exit_scope()
+                continue
+            if not node:
+                continue
             
-            # Procesar hijos en el nuevo ámbito
-            for hijo in node.hijos:
-                if not self._process_declarations(hijo):
+            # Si es una declaración de variable, verificar duplicados
+            if node.tipo == 'DECLARACION_VARIABLE':
+                if not self.error_detector.check_duplicate_declarations(node):
                     errors_found = True
+                continue
             
-            # Salir del ámbito
-            self.symbol_table.exit_scope()
-        else:
-            # Procesar hijos normalmente
-            for hijo in node.hijos:
-                if not self._process_declarations(hijo):
-                    errors_found = True
+            # Procesar estructuras de control que crean nuevos ámbitos
+            if node.tipo in _SCOPED_CONTROL_NODE_TYPES:
+                # Entrar a un nuevo ámbito
+                scope_name = f"{_SCOPE_NAME_PREFIXES[node.tipo]}_{node.linea}"
+                symbol_table.enter_scope(scope_name)
+                pending.append(_EXIT_SCOPE)
+            
+            # Procesar hijos (en orden, por eso se apilan invertidos)
+            pending.extend(reversed(node.hijos))
         
         return not errors_found
 
@@ -3047,11 +3793,11 @@ def process_test_file(filename: str = "TestSemantica.txt") -> Tuple[Optional[Ann
     Returns:
         Tupla con (AST anotado, tabla de símbolos, errores, reporte completo)
     """
+    if _INTEGRATION_IMPORT_ERROR is not None:
+        error_msg = f"Error procesando archivo: {_INTEGRATION_IMPORT_ERROR}"
+        return None, SymbolTable(), [SemanticError('processing_error', error_msg, 0, 0)], error_msg
+    
     try:
-        # Importar módulos necesarios
-        import lexico
-        import sintactico
-        
         # Leer archivo de prueba
         try:
             with open(filename, 'r', encoding='utf-8') as f:
@@ -3114,65 +3860,58 @@ def generate_complete_analysis_report(filename: str, tokens: List, ast, annotate
     Returns:
         Reporte completo formateado
     """
-    reporte = f"REPORTE COMPLETO DE ANÁLISIS - {filename}\n"
-    reporte += "=" * 80 + "\n\n"
+    partes = [f"REPORTE COMPLETO DE ANÁLISIS - {filename}\n", "=" * 80 + "\n\n"]
+    append = partes.append
     
     # Información general
-    reporte += "RESUMEN GENERAL:\n"
-    reporte += "-" * 40 + "\n"
-    reporte += f"Archivo procesado: {filename}\n"
-    reporte += f"Tokens generados: {len(tokens) if tokens else 0}\n"
-    reporte += f"AST generado: {'Sí' if ast else 'No'}\n"
-    reporte += f"AST anotado: {'Sí' if annotated_ast else 'No'}\n"
-    reporte += f"Errores semánticos: {len(semantic_errors)}\n"
-    reporte += f"Variables declaradas: {len(symbol_table.get_all_symbols())}\n\n"
+    append("RESUMEN GENERAL:\n" + _REPORT_SECTION_RULE)
+    append(f"Archivo procesado: {filename}\n"
+           f"Tokens generados: {len(tokens) if tokens else 0}\n"
+           f"AST generado: {'Sí' if ast else 'No'}\n"
+           f"AST anotado: {'Sí' if annotated_ast else 'No'}\n"
+           f"Errores semánticos: {len(semantic_errors)}\n"
+           f"Variables declaradas: {symbol_table.get_symbol_count()}\n\n")
     
     # Tabla de símbolos
-    reporte += "TABLA DE SÍMBOLOS:\n"
-    reporte += "-" * 40 + "\n"
-    reporte += symbol_table.to_formatted_table() + "\n"
+    append("TABLA DE SÍMBOLOS:\n" + _REPORT_SECTION_RULE)
+    append(symbol_table.to_formatted_table() + "\n")
     
     # Errores semánticos
     if semantic_errors:
-        reporte += "ERRORES SEMÁNTICOS DETECTADOS:\n"
-        reporte += "-" * 40 + "\n"
-        error_reporter = ErrorReporter()
-        for error in semantic_errors:
-            error_reporter.errors.append(error)
-        reporte += error_reporter.format_errors() + "\n"
+        append("ERRORES SEMÁNTICOS DETECTADOS:\n" + _REPORT_SECTION_RULE)
+        append(ErrorReporter.format_error_list(semantic_errors) + "\n")
     else:
-        reporte += "No se encontraron errores semánticos.\n\n"
+        append("No se encontraron errores semánticos.\n\n")
     
     # Estadísticas del AST anotado
     if annotated_ast:
         stats = get_annotation_statistics(annotated_ast)
-        reporte += "ESTADÍSTICAS DEL AST ANOTADO:\n"
-        reporte += "-" * 40 + "\n"
-        reporte += f"Total de nodos: {stats['total_nodes']}\n"
-        reporte += f"Nodos anotados: {stats['annotated_nodes']} ({stats['annotation_percentage']:.1f}%)\n"
-        reporte += f"Nodos con información de tipo: {stats['nodes_with_type']}\n"
-        reporte += f"Nodos con valor semántico: {stats['nodes_with_value']}\n"
-        reporte += f"Referencias de símbolos: {stats['nodes_with_symbol_ref']}\n"
-        reporte += f"Nodos constantes: {stats['constant_nodes']}\n"
-        reporte += f"Nodos lvalue: {stats['lvalue_nodes']}\n\n"
+        append("ESTADÍSTICAS DEL AST ANOTADO:\n" + _REPORT_SECTION_RULE)
+        append(f"Total de nodos: {stats['total_nodes']}\n"
+               f"Nodos anotados: {stats['annotated_nodes']} ({stats['annotation_percentage']:.1f}%)\n"
+               f"Nodos con información de tipo: {stats['nodes_with_type']}\n"
+               f"Nodos con valor semántico: {stats['nodes_with_value']}\n"
+               f"Referencias de símbolos: {stats['nodes_with_symbol_ref']}\n"
+               f"Nodos constantes: {stats['constant_nodes']}\n"
+               f"Nodos lvalue: {stats['lvalue_nodes']}\n\n")
         
         # Distribución de tipos
         if stats['types_distribution']:
-            reporte += "DISTRIBUCIÓN DE TIPOS:\n"
+            append("DISTRIBUCIÓN DE TIPOS:\n")
             for tipo, count in stats['types_distribution'].items():
-                reporte += f"  {tipo}: {count}\n"
-            reporte += "\n"
+                append(f"  {tipo}: {count}\n")
+            append("\n")
     
     # AST anotado (versión resumida)
     if annotated_ast:
-        reporte += "AST ANOTADO (ESTRUCTURA):\n"
-        reporte += "-" * 40 + "\n"
-        reporte += annotated_ast.to_formatted_string()[:2000]  # Limitar tamaño
-        if len(annotated_ast.to_formatted_string()) > 2000:
-            reporte += "\n... (truncado para brevedad)\n"
-        reporte += "\n"
-    
-    return reporte
+        append("AST ANOTADO (ESTRUCTURA):\n" + _REPORT_SECTION_RULE)
+        ast_text = annotated_ast.to_formatted_string()
+        append(ast_text[:2000])  # Limitar tamaño
+        if len(ast_text) > 2000:
+            append("\n... (truncado para brevedad)\n")
+        append("\n")
+    
+    return "".join(partes)
 
 def save_analysis_results(filename: str, annotated_ast: Optional[AnnotatedASTNode], 
                          symbol_table: SymbolTable, semantic_errors: List[SemanticError],
@@ -3195,7 +3934,7 @@ def save_analysis_results(filename: str, annotated_ast: Optional[AnnotatedASTNod
     try:
         # Guardar tabla de símbolos
         symbol_file = f"{base_output_name}_symbol_table.txt"
-        with open(symbol_file, 'w', encoding='utf-8') as f:
+        with open(symbol_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
             f.write(f"TABLA DE SÍMBOLOS - {filename}\n")
             f.write("=" * 50 + "\n\n")
             f.write(symbol_table.to_formatted_table())
@@ -3207,14 +3946,11 @@ def save_analysis_results(filename: str, annotated_ast: Optional[AnnotatedASTNod
     try:
         # Guardar errores semánticos
         errors_file = f"{base_output_name}_errors.txt"
-        with open(errors_file, 'w', encoding='utf-8') as f:
+        with open(errors_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
             f.write(f"ERRORES SEMÁNTICOS - {filename}\n")
             f.write("=" * 50 + "\n\n")
             if semantic_errors:
-                error_reporter = ErrorReporter()
-                for error in semantic_errors:
-                    error_reporter.errors.append(error)
-                f.write(error_reporter.format_errors())
+                f.write(ErrorReporter.format_error_list(semantic_errors))
             else:
                 f.write("No se encontraron errores semánticos.")
         save_status['errors'] = True
@@ -3226,10 +3962,10 @@ def save_analysis_results(filename: str, annotated_ast: Optional[AnnotatedASTNod
         # Guardar AST anotado
         if annotated_ast:
             ast_file = f"{base_output_name}_annotated_ast.txt"
-            with open(ast_file, 'w', encoding='utf-8') as f:
+            with open(ast_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
                 f.write(f"AST ANOTADO - {filename}\n")
                 f.write("=" * 50 + "\n\n")
-                f.write(annotated_ast.to_formatted_string())
+                annotated_ast.write_formatted(f.write)
             save_status['annotated_ast'] = True
         else:
             save_status['annotated_ast'] = False
@@ -3254,13 +3990,12 @@ def analyze_test_semantica() -> str:
     )
     
     # Agregar información sobre archivos guardados
-    reporte += "\nARCHIVOS GENERADOS:\n"
-    reporte += "-" * 40 + "\n"
+    partes = [reporte, "\nARCHIVOS GENERADOS:\n", _REPORT_SECTION_RULE]
     for file_type, success in save_status.items():
         status = "✓" if success else "✗"
-        reporte += f"{status} {file_type}: TestSemantica_results_{file_type}.txt\n"
+        partes.append(f"{status} {file_type}: TestSemantica_results_{file_type}.txt\n")
     
-    return reporte
+    return "".join(partes)
 
 def integrate_with_existing_analyzers(codigo_fuente: str) -> Tuple[Optional[AnnotatedASTNode], SymbolTable, List[SemanticError]]:
     """
@@ -3272,11 +4007,11 @@ def integrate_with_existing_analyzers(codigo_fuente: str) -> Tuple[Optional[Anno
     Returns:
         Tupla con (AST anotado, tabla de símbolos, errores semánticos)
     """
+    if _INTEGRATION_IMPORT_ERROR is not None:
+        error_msg = f"Error importando analizadores: {_INTEGRATION_IMPORT_ERROR}"
+        return None, SymbolTable(), [SemanticError('import_error', error_msg, 0, 0)]
+    
     try:
-        # Importar módulos existentes
-        import lexico
-        import sintactico
-        
         # Análisis léxico
         tokens, errores_lexicos = lexico.analizar_codigo(codigo_fuente)
         
@@ -3329,10 +4064,7 @@ def create_semantic_analysis_for_gui(codigo_fuente: str) -> Dict[str, Any]:
         
         # Formatear errores
         if semantic_errors:
-            error_reporter = ErrorReporter()
-            for error in semantic_errors:
-                error_reporter.errors.append(error)
-            gui_results['errors'] = error_reporter.format_errors()
+            gui_results['errors'] = ErrorReporter.format_error_list(semantic_errors)
         else:
             gui_results['errors'] = "No se encontraron errores semánticos"
         
@@ -3352,7 +4084,8 @@ def create_semantic_analysis_for_gui(codigo_fuente: str) -> Dict[str, Any]:
 def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode], 
                                  symbol_table: SymbolTable, 
                                  semantic_errors: List[SemanticError],
-                                 base_filename: str = "semantic_analysis") -> Dict[str, bool]:
+                                 base_filename: str = "semantic_analysis",
+                                 skip_empty_reports: bool = False) -> Dict[str, bool]:
     """
     Exporta los resultados del análisis semántico a archivos formateados
     
@@ -3361,23 +4094,32 @@ def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode],
         symbol_table: Tabla de símbolos construida
         semantic_errors: Lista de errores semánticos encontrados
         base_filename: Nombre base para los archivos de salida
+        skip_empty_reports: Si es True y no hay errores, no se escribe el archivo
+            de errores (un archivo anterior con el mismo nombre no se modifica)
         
     Returns:
         Diccionario con el estado de cada archivo exportado
     """
     export_status = {}
     
+    # Datos compartidos por varias secciones; se obtienen una sola vez
+    all_symbols = symbol_table.get_all_symbols()
+    error_count = len(semantic_errors)
+    
+    # Todos los archivos de una exportación llevan la misma marca de tiempo
+    generated_at = datetime.now()
+    generated_text = generated_at.strftime('%Y-%m-%d %H:%M:%S')
+    
     # 1. Exportar tabla de símbolos formateada
     try:
         symbol_table_file = f"{base_filename}_symbol_table.txt"
-        with open(symbol_table_file, 'w', encoding='utf-8') as f:
+        with open(symbol_table_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
             f.write("TABLA DE SÍMBOLOS - ANÁLISIS SEMÁNTICO\n")
             f.write("=" * 80 + "\n")
-            f.write(f"Generado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            f.write(f"Generado: {generated_text}\n\n")
             f.write(symbol_table.to_formatted_table())
             
             # Agregar estadísticas adicionales
-            all_symbols = symbol_table.get_all_symbols()
             #f.write(f"\nESTADÍSTICAS:\n")
             #f.write("-" * 40 + "\n")
             #f.write(f"Total de variables declaradas: {len(all_symbols)}\n")
@@ -3401,60 +4143,61 @@ def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode],
         export_status['symbol_table'] = False
     
     # 2. Exportar reporte de errores semánticos
-    try:
-        errors_file = f"{base_filename}_errors.txt"
-        with open(errors_file, 'w', encoding='utf-8') as f:
-            f.write("REPORTE DE ERRORES SEMÁNTICOS\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Generado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            if semantic_errors:
-                # Crear reportador temporal para formatear
-                error_reporter = ErrorReporter()
-                for error in semantic_errors:
-                    error_reporter.add_error(error.error_type, error.message, 
-                                           error.line, error.column, error.severity)
-                
-                f.write(error_reporter.format_errors())
-                
-                # Agregar análisis detallado de errores
-                f.write(f"\n\nANÁLISIS DETALLADO DE ERRORES:\n")
-                f.write("-" * 50 + "\n")
-                
-                # Agrupar errores por tipo
-                errors_by_type = {}
-                for error in semantic_errors:
-                    if error.error_type not in errors_by_type:
-                        errors_by_type[error.error_type] = []
-                    errors_by_type[error.error_type].append(error)
+    # (con skip_empty_reports no se genera si no hay errores ni se lista en el resumen)
+    if semantic_errors or not skip_empty_reports:
+        try:
+            errors_file = f"{base_filename}_errors.txt"
+            with open(errors_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
+                f.write("REPORTE DE ERRORES SEMÁNTICOS\n")
+                f.write("=" * 80 + "\n")
+                f.write(f"Generado: {generated_text}\n\n")
                 
-                for error_type, errors in errors_by_type.items():
-                    f.write(f"\n{error_type.replace('_', ' ').title()}:\n")
-                    for error in errors:
-                        f.write(f"  - Línea {error.line}, Columna {error.column}: {error.message}\n")
-            else:
-                f.write("✓ No se encontraron errores semánticos\n")
-                f.write("\nEl código fuente pasó todas las verificaciones semánticas:\n")
-                f.write("- Variables declaradas correctamente\n")
-                f.write("- Tipos compatibles en todas las operaciones\n")
-                f.write("- No hay variables no declaradas\n")
-                f.write("- No hay declaraciones duplicadas\n")
-        
-        export_status['errors'] = True
-    except Exception as e:
-        print(f"Error exportando errores: {e}")
-        export_status['errors'] = False
+                if semantic_errors:
+                    # Crear reportador temporal para formatear
+                    error_reporter = ErrorReporter()
+                    for error in semantic_errors:
+                        error_reporter.add_error(error.error_type, error.message, 
+                                               error.line, error.column, error.severity)
+                    
+                    f.writelines(error_reporter.iter_formatted_lines())
+                    
+                    # Agregar análisis detallado de errores
+                    f.write(f"\n\nANÁLISIS DETALLADO DE ERRORES:\n")
+                    f.write("-" * 50 + "\n")
+                    
+                    # Agrupar errores por tipo (en el orden en que aparece cada tipo)
+                    errors_by_type = defaultdict(list)
+                    for error in semantic_errors:
+                        errors_by_type[error.error_type].append(error)
+                    
+                    for error_type, errors in errors_by_type.items():
+                        f.write(f"\n{error_type.replace('_', ' ').title()}:\n")
+                        for error in errors:
+                            f.write(f"  - Línea {error.line}, Columna {error.column}: {error.message}\n")
+                else:
+                    f.write("✓ No se encontraron errores semánticos\n")
+                    f.write("\nEl código fuente pasó todas las verificaciones semánticas:\n")
+                    f.write("- Variables declaradas correctamente\n")
+                    f.write("- Tipos compatibles en todas las operaciones\n")
+                    f.write("- No hay variables no declaradas\n")
+                    f.write("- No hay declaraciones duplicadas\n")
+            
+            export_status['errors'] = True
+        except Exception as e:
+            print(f"Error exportando errores: {e}")
+            export_status['errors'] = False
     
     # 3. Exportar AST anotado
+    stats = None
     try:
         if annotated_ast:
             ast_file = f"{base_filename}_annotated_ast.txt"
-            with open(ast_file, 'w', encoding='utf-8') as f:
+            with open(ast_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
                 f.write("AST ANOTADO CON INFORMACIÓN SEMÁNTICA\n")
                 f.write("=" * 80 + "\n")
-                f.write(f"Generado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+                f.write(f"Generado: {generated_text}\n\n")
                 
-                # Agregar estadísticas del AST
+                # Agregar estadísticas del AST (se reutilizan en el JSON)
                 stats = get_annotation_statistics(annotated_ast)
                 f.write("ESTADÍSTICAS DEL AST ANOTADO:\n")
                 f.write("-" * 40 + "\n")
@@ -3477,7 +4220,7 @@ def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode],
                 # AST formateado
                 f.write("ESTRUCTURA DEL AST ANOTADO:\n")
                 f.write("-" * 40 + "\n")
-                f.write(annotated_ast.to_formatted_string())
+                annotated_ast.write_formatted(f.write)
             
             export_status['annotated_ast'] = True
         else:
@@ -3490,23 +4233,25 @@ def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode],
     try:
         if annotated_ast:
             json_file = f"{base_filename}_annotated_ast.json"
-            import json
-            
-            ast_dict = annotated_ast.to_annotated_dict()
             
             # Agregar metadatos
-            output_data = {
+            header_data = {
                 'metadata': {
-                    'generated_at': datetime.now().isoformat(),
+                    'generated_at': generated_at.isoformat(),
                     'generator': 'PyGFrame Semantic Analyzer',
                     'version': '1.0'
                 },
-                'statistics': get_annotation_statistics(annotated_ast),
-                'annotated_ast': ast_dict
+                'statistics': stats if stats is not None else get_annotation_statistics(annotated_ast)
             }
             
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # Se serializa el encabezado sin su llave de cierre y el AST se emite
+            # por fragmentos como tercera clave, sin construir su diccionario
+            header_json = json.dumps(header_data, indent=2, ensure_ascii=False)
+            with open(json_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
+                f.write(header_json[:-2])
+                f.write(',\n  "annotated_ast": ')
+                annotated_ast.write_annotated_json(f.write, 1)
+                f.write("\n}")
             
             export_status['annotated_ast_json'] = True
         else:
@@ -3518,18 +4263,18 @@ def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode],
     # 5. Exportar resumen completo
     try:
         summary_file = f"{base_filename}_summary.txt"
-        with open(summary_file, 'w', encoding='utf-8') as f:
+        with open(summary_file, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE) as f:
             f.write("RESUMEN COMPLETO DEL ANÁLISIS SEMÁNTICO\n")
             f.write("=" * 80 + "\n")
-            f.write(f"Generado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            f.write(f"Generado: {generated_text}\n\n")
             
             # Información general
             f.write("INFORMACIÓN GENERAL:\n")
             f.write("-" * 40 + "\n")
             f.write(f"AST anotado generado: {'Sí' if annotated_ast else 'No'}\n")
-            f.write(f"Variables declaradas: {len(symbol_table.get_all_symbols())}\n")
-            f.write(f"Errores semánticos: {len(semantic_errors)}\n")
-            f.write(f"Estado del análisis: {'Exitoso' if len(semantic_errors) == 0 else 'Con errores'}\n\n")
+            f.write(f"Variables declaradas: {len(all_symbols)}\n")
+            f.write(f"Errores semánticos: {error_count}\n")
+            f.write(f"Estado del análisis: {'Exitoso' if error_count == 0 else 'Con errores'}\n\n")
             
             # Resumen de archivos generados
             f.write("ARCHIVOS GENERADOS:\n")
@@ -3542,7 +4287,6 @@ def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode],
             # Tabla de símbolos resumida
             f.write("TABLA DE SÍMBOLOS (RESUMEN):\n")
             f.write("-" * 40 + "\n")
-            all_symbols = symbol_table.get_all_symbols()
             if all_symbols:
                 for symbol in all_symbols:
                     primera_linea = symbol.lines[0] if symbol.lines else "N/A"
@@ -3558,8 +4302,8 @@ def export_semantic_analysis_files(annotated_ast: Optional[AnnotatedASTNode],
                 f.write("-" * 40 + "\n")
                 for error in semantic_errors[:10]:  # Mostrar solo los primeros 10
                     f.write(f"  Línea {error.line}: {error.message}\n")
-                if len(semantic_errors) > 10:
-                    f.write(f"  ... y {len(semantic_errors) - 10} errores más\n")
+                if error_count > 10:
+                    f.write(f"  ... y {error_count - 10} errores más\n")
             else:
                 f.write("✓ No se encontraron errores semánticos\n")
         
@@ -2,12 +2,21 @@
 # Analizador Sintáctico Descendente Recursivo para el compilador PyGFrame
 
 import json
+import sys
 from typing import List, Tuple, Dict, Any, Optional
 
 class Nodo:
     """Clase que representa un nodo del Árbol Sintáctico Abstracto (AST)"""
+    __slots__ = ('tipo', 'valor', 'linea', 'columna', 'hijos', 'padre')
+    
+    # Los nodos del parser no tienen tipo semántico; el análisis semántico
+    # lo consulta directamente y los nodos anotados lo sobrescriben con un slot
+    semantic_type = None
+    
     def __init__(self, tipo: str, valor: str = None, linea: int = 0, columna: int = 0):
-        self.tipo = tipo
+        # Internar el tipo: los operadores tomados del código fuente se comparan
+        # después contra literales, y así la comparación se resuelve por identidad
+        self.tipo = sys.intern(tipo)
         self.valor = valor
         self.linea = linea
         self.columna = columna
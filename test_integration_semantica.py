@@ -6,7 +6,11 @@ Tests the complete semantic analysis workflow and validates expected results.
 
 import unittest
 import os
-from semantico import process_test_file, analyze_test_semantica
+from semantico import (
+    process_test_file, analyze_test_semantica,
+    integrate_with_existing_analyzers, create_semantic_analysis_for_gui,
+    SemanticAnalyzer
+)
 from lexico import AnalizadorLexico
 from sintactico import AnalizadorSintactico
 
@@ -343,6 +347,52 @@ class TestSemanticAnalysisComponents(unittest.TestCase):
                     content = f.read()
                 self.assertGreater(len(content), 0, 
                                  f"Output file '{filename}' should have content")
+    
+    def test_large_error_count_is_fully_reported(self):
+        """Test that programs with more than 1000 semantic errors lose none of them"""
+        # 700 assignments, each with two undeclared variables
+        lineas = [f"    u{i} = v{i} + a;\n" for i in range(700)]
+        codigo = "main {\n    int a;\n" + "".join(lineas) + "}\n"
+        
+        annotated_ast, symbol_table, errors = integrate_with_existing_analyzers(codigo)
+        self.assertEqual(len(errors), 1400)
+        
+        gui_results = create_semantic_analysis_for_gui(codigo)
+        self.assertEqual(gui_results['error_count'], 1400)
+        self.assertIn("- Errores: 1400", gui_results['errors'])
+        self.assertNotIn("Omitidos", gui_results['errors'])
+    
+    def _run_comprehensive_check(self, duplicated_declarations):
+        """Run perform_comprehensive_check on a program with the given duplicates"""
+        # Besides the duplicates: an undeclared variable, a type incompatibility
+        # and an invalid conversion, one for each later phase
+        codigo = ("main {\n    int a;\n" + "    int a;\n" * duplicated_declarations
+                  + "    a = b;\n    a = true;\n    a = 1.5;\n}\n")
+        tokens, _ = AnalizadorLexico(codigo).analizar()
+        ast, _ = AnalizadorSintactico(tokens).analizar()
+        
+        analyzer = SemanticAnalyzer(ast, tokens)
+        self.assertFalse(analyzer.perform_comprehensive_check(ast))
+        return analyzer.error_reporter
+    
+    def test_comprehensive_check_runs_every_phase(self):
+        """Test that every phase runs while the error count stays low"""
+        reporter = self._run_comprehensive_check(3)
+        
+        self.assertEqual(reporter.get_error_count_by_type('duplicate_declaration'), 3)
+        self.assertEqual(reporter.get_error_count_by_type('undeclared_variable'), 1)
+        self.assertGreater(reporter.get_error_count_by_type('type_incompatibility'), 0)
+        self.assertGreater(reporter.get_error_count_by_type('invalid_conversion'), 0)
+    
+    def test_comprehensive_check_stops_after_too_many_errors(self):
+        """Test that later phases are skipped once more than 50 errors are reported"""
+        reporter = self._run_comprehensive_check(51)
+        
+        self.assertEqual(reporter.get_error_count(), 51)
+        self.assertEqual(reporter.get_error_count_by_type('duplicate_declaration'), 51)
+        self.assertEqual(reporter.get_error_count_by_type('undeclared_variable'), 0)
+        self.assertEqual(reporter.get_error_count_by_type('type_incompatibility'), 0)
+        self.assertEqual(reporter.get_error_count_by_type('invalid_conversion'), 0)
 
 
 if __name__ == '__main__':
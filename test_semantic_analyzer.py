@@ -4,10 +4,14 @@ Unit tests for the semantic analyzer core components.
 Tests SymbolTable, TypeSystem, and ErrorReporter functionality.
 """
 
+import json
+import os
+import tempfile
 import unittest
 from semantico import (
     TypeInfo, SymbolEntry, SemanticError, SymbolTable, 
-    TypeSystem, ErrorReporter, SemanticErrorDetector,
+    TypeSystem, ErrorReporter, SemanticErrorDetector, ASTAnnotator,
+    export_semantic_analysis_files,
     TIPO_INT, TIPO_FLOAT, TIPO_BOOLEAN, TIPO_VOID
 )
 from sintactico import Nodo
@@ -30,6 +34,16 @@ class TestTypeInfo(unittest.TestCase):
         self.assertTrue(array_type.is_array)
         self.assertEqual(array_type.array_size, 10)
     
+    def test_type_interning(self):
+        """Test that TypeInfo.get returns shared instances"""
+        self.assertIs(TypeInfo.get('int'), TIPO_INT)
+        self.assertIs(TypeInfo.get('float', True, 5), TypeInfo.get('float', True, 5))
+        self.assertIsNot(TypeInfo.get('float', True, 5), TypeInfo.get('float', True))
+
+        # Direct construction still compares by value
+        self.assertEqual(TypeInfo('int'), TIPO_INT)
+        self.assertEqual(hash(TypeInfo('int')), hash(TIPO_INT))
+
     def test_is_numeric(self):
         """Test numeric type checking"""
         self.assertTrue(TIPO_INT.is_numeric())
@@ -116,6 +130,7 @@ class TestSymbolTable(unittest.TestCase):
         # Duplicate declaration in same scope should fail
         duplicate = self.symbol_table.declare_variable('x', TIPO_FLOAT, 2, 10)
         self.assertFalse(duplicate)
+        self.assertEqual(self.symbol_table.get_symbol_count(), 1)
     
     def test_variable_lookup(self):
         """Test variable lookup across scopes"""
@@ -140,6 +155,32 @@ class TestSymbolTable(unittest.TestCase):
         self.assertIsNotNone(self.symbol_table.lookup_variable('global_var'))
         self.assertIsNone(self.symbol_table.lookup_variable('local_var'))
     
+    def test_variable_lookup_shadowing(self):
+        """Test that cached lookups follow declarations and scope changes"""
+        self.symbol_table.declare_variable('x', TIPO_INT, 1, 1)
+        self.assertIsNone(self.symbol_table.lookup_variable('y'))
+        self.assertEqual(self.symbol_table.lookup_variable('x').type_info, TIPO_INT)
+        
+        # Shadow in an inner scope
+        self.symbol_table.enter_scope('inner')
+        self.assertEqual(self.symbol_table.lookup_variable('x').type_info, TIPO_INT)
+        self.symbol_table.declare_variable('x', TIPO_FLOAT, 2, 1)
+        self.assertEqual(self.symbol_table.lookup_variable('x').type_info, TIPO_FLOAT)
+        self.symbol_table.declare_variable('y', TIPO_BOOLEAN, 3, 1)
+        self.assertIsNotNone(self.symbol_table.lookup_variable('y'))
+        
+        # Back in global scope the outer declaration is visible again
+        self.symbol_table.exit_scope()
+        self.assertEqual(self.symbol_table.lookup_variable('x').type_info, TIPO_INT)
+        self.assertIsNone(self.symbol_table.lookup_variable('y'))
+        
+        # Entering and leaving a scope without declarations keeps the caches valid
+        version = self.symbol_table.version
+        self.symbol_table.enter_scope('empty')
+        self.symbol_table.exit_scope()
+        self.assertEqual(self.symbol_table.version, version)
+        self.assertEqual(self.symbol_table.lookup_variable('x').type_info, TIPO_INT)
+    
     def test_variable_initialization(self):
         """Test variable initialization tracking"""
         self.symbol_table.declare_variable('x', TIPO_INT, 1, 1)
@@ -167,6 +208,18 @@ class TestSymbolTable(unittest.TestCase):
         self.assertIn('int', formatted)
         self.assertIn('float', formatted)
 
+    def test_symbol_table_formatting_follows_changes(self):
+        """Test the cached formatted table is rebuilt after usages and declarations"""
+        self.symbol_table.declare_variable('x', TIPO_INT, 1, 5)
+        first = self.symbol_table.to_formatted_table()
+        self.assertIs(self.symbol_table.to_formatted_table(), first)
+
+        self.symbol_table.record_usage('x', 7)
+        self.assertIn('1, 7', self.symbol_table.to_formatted_table())
+
+        self.symbol_table.declare_variable('zeta', TIPO_BOOLEAN, 8, 1)
+        self.assertIn('zeta', self.symbol_table.to_formatted_table())
+
 
 class TestTypeSystem(unittest.TestCase):
     """Test cases for TypeSystem class"""
@@ -282,6 +335,73 @@ class TestTypeSystem(unittest.TestCase):
         inferred_type = self.type_system.infer_expression_type(id_node, self.symbol_table)
         self.assertEqual(inferred_type.base_type, 'int')
 
+    def test_inference_cache_follows_symbol_table(self):
+        """Test that cached inferences are discarded when the symbol table changes"""
+        sum_node = Nodo('+', '+', 1, 3)
+        sum_node.agregar_hijo(Nodo('ID', 'y', 1, 1))
+        sum_node.agregar_hijo(Nodo('NUM_FLOAT', '1.5', 1, 5))
+
+        # Results are only memoized inside a pass
+        self.type_system.begin_pass()
+        try:
+            # Undeclared operand: no type can be inferred
+            self.assertIsNone(self.type_system.infer_expression_type(sum_node, self.symbol_table))
+
+            # Declaring the variable must invalidate the cached result
+            self.symbol_table.declare_variable('y', TIPO_INT, 1, 1)
+            inferred_type = self.type_system.infer_expression_type(sum_node, self.symbol_table)
+            self.assertEqual(inferred_type, TIPO_FLOAT)
+
+            # A different symbol table does not reuse the cache either
+            self.assertIsNone(self.type_system.infer_expression_type(sum_node, SymbolTable()))
+        finally:
+            self.type_system.end_pass()
+
+    def test_inference_follows_tree_changes(self):
+        """Test that inference reflects changes to the tree between passes"""
+        for symbol_table in (self.symbol_table, None):
+            sum_node = Nodo('+', '+', 1, 3)
+            sum_node.agregar_hijo(Nodo('NUM_INT', '1', 1, 1))
+            sum_node.agregar_hijo(Nodo('NUM_INT', '2', 1, 5))
+            self.assertEqual(self.type_system.infer_expression_type(sum_node, symbol_table), TIPO_INT)
+
+            sum_node.hijos[1] = Nodo('NUM_FLOAT', '2.5', 1, 5)
+            self.assertEqual(self.type_system.infer_expression_type(sum_node, symbol_table), TIPO_FLOAT)
+
+            # A new pass starts with an empty cache
+            self.type_system.begin_pass()
+            self.assertEqual(self.type_system.infer_expression_type(sum_node, symbol_table), TIPO_FLOAT)
+            self.type_system.end_pass()
+            sum_node.hijos[1] = Nodo('NUM_INT', '2', 1, 5)
+            self.type_system.begin_pass()
+            self.assertEqual(self.type_system.infer_expression_type(sum_node, symbol_table), TIPO_INT)
+            self.type_system.end_pass()
+
+    def test_validation_follows_tree_changes(self):
+        """Test that clean subtrees are skipped only within one pass"""
+        sum_node = Nodo('+', '+', 1, 3)
+        sum_node.agregar_hijo(Nodo('NUM_INT', '1', 1, 1))
+        sum_node.agregar_hijo(Nodo('NUM_INT', '2', 1, 5))
+        left_error = "No se puede determinar el tipo del operando izquierdo en línea 1"
+
+        # Within a pass a clean subtree is validated once
+        self.type_system.begin_pass()
+        try:
+            self.assertEqual(self.type_system.validate_expression_types(sum_node, self.symbol_table), (True, []))
+            sum_node.hijos[0].tipo = 'DESCONOCIDO'
+            self.assertEqual(self.type_system.validate_expression_types(sum_node, self.symbol_table), (True, []))
+        finally:
+            self.type_system.end_pass()
+
+        # Outside a pass every call sees the current operands
+        valid, errors = self.type_system.validate_expression_types(sum_node, self.symbol_table)
+        self.assertFalse(valid)
+        self.assertEqual(errors, [left_error])
+        sum_node.hijos[0].tipo = 'NUM_INT'
+        self.assertEqual(self.type_system.validate_expression_types(sum_node, self.symbol_table), (True, []))
+        sum_node.hijos[0].tipo = 'DESCONOCIDO'
+        self.assertEqual(self.type_system.validate_expression_types(sum_node, self.symbol_table), (False, [left_error]))
+
 
 class TestErrorReporter(unittest.TestCase):
     """Test cases for ErrorReporter class"""
@@ -325,6 +445,10 @@ class TestErrorReporter(unittest.TestCase):
         # Test operator misuse error
         self.error_reporter.add_operator_misuse_error('+', ['int', 'boolean'], 4, 20)
         self.assertEqual(self.error_reporter.get_error_count_by_type('operator_misuse'), 1)
+        
+        # Variable-related errors carry the variable name as structured data
+        names = [error.symbol_name for error in self.error_reporter.get_errors()]
+        self.assertEqual(names, ['x', 'y', None, None])
     
     def test_error_formatting(self):
         """Test error formatting for display"""
@@ -340,6 +464,36 @@ class TestErrorReporter(unittest.TestCase):
         self.assertIn('WARNING', formatted)
         self.assertIn('RESUMEN', formatted)
     
+    def test_format_error_list_matches_reporter(self):
+        """Test that formatting a plain error list matches a filled reporter"""
+        self.error_reporter.add_undeclared_variable_error('x', 3, 5)
+        self.error_reporter.add_warning('unused_variable', 'Variable y is unused', 1, 10)
+        issues = self.error_reporter.get_all_issues()
+        
+        manual = ErrorReporter()
+        manual.errors.extend(issues)
+        
+        self.assertEqual(ErrorReporter.format_error_list(issues), manual.format_errors())
+        self.assertEqual(ErrorReporter.format_error_list([]), ErrorReporter().format_errors())
+
+    def test_most_severe_error_follows_list_edits(self):
+        """Test that the most severe issue reflects direct edits to the lists"""
+        self.error_reporter.add_undeclared_variable_error('x', 3, 5)
+        self.error_reporter.add_undeclared_variable_error('y', 1, 5)
+        self.assertEqual(self.error_reporter.get_most_severe_error().line, 1)
+
+        replacement = SemanticError('type_incompatibility', 'Tipo incorrecto', 4, 1)
+        self.error_reporter.errors[1] = replacement
+        self.assertEqual(self.error_reporter.get_most_severe_error().line, 3)
+
+        self.error_reporter.errors.append(SemanticError('type_incompatibility', 'Tipo incorrecto', 2, 1))
+        self.assertEqual(self.error_reporter.get_most_severe_error().line, 2)
+
+        self.error_reporter.clear()
+        self.error_reporter.add_warning('unused_variable', 'Variable y is unused', 2, 10)
+        self.error_reporter.warnings[0] = SemanticError('unused_variable', 'Variable z is unused', 5, 1, 'warning')
+        self.assertEqual(self.error_reporter.get_most_severe_error().line, 5)
+
     def test_error_export_format(self):
         """Test error export format for GUI"""
         self.error_reporter.add_undeclared_variable_error('x', 1, 5)
@@ -354,7 +508,55 @@ class TestErrorReporter(unittest.TestCase):
         self.assertEqual(len(export_data['warnings']), 1)
         self.assertEqual(export_data['summary']['total_errors'], 1)
         self.assertEqual(export_data['summary']['total_warnings'], 1)
-    
+
+    def test_error_export_objects_match_dicts(self):
+        """Test object-based GUI export mirrors the dict-based one"""
+        self.error_reporter.add_undeclared_variable_error('x', 1, 5)
+        self.error_reporter.add_warning('unused_variable', 'Variable y is unused', 2, 10)
+
+        as_dicts = self.error_reporter.format_for_gui()
+        as_objects = self.error_reporter.format_for_gui_objects()
+
+        self.assertEqual(as_objects['summary'], as_dicts['summary'])
+        for kind in ('errors', 'warnings'):
+            self.assertEqual(
+                [{'type': e.error_type, 'message': e.message, 'line': e.line,
+                  'column': e.column, 'severity': e.severity} for e in as_objects[kind]],
+                as_dicts[kind]
+            )
+
+    def test_issue_limit(self):
+        """Test issues beyond max_issues are counted but not stored"""
+        reporter = ErrorReporter(max_issues=2)
+        for line in range(1, 5):
+            reporter.add_undeclared_variable_error('x', line, 1)
+        reporter.add_warning('unused_variable', 'Variable y is unused', 1, 1)
+
+        self.assertEqual(reporter.get_error_count(), 2)
+        self.assertEqual(reporter.get_warning_count(), 1)
+        self.assertEqual(reporter.get_dropped_count(), 2)
+        self.assertEqual(reporter.get_error_count_by_type('undeclared_variable'), 4)
+        self.assertIn('Omitidos', reporter.format_errors())
+        
+        # A repeated issue past the limit is dropped and counted only once
+        duplicated = ErrorReporter(max_issues=1)
+        for _ in range(3):
+            duplicated.add_undeclared_variable_error('x', 1, 1)
+            duplicated.add_undeclared_variable_error('y', 2, 1)
+        self.assertEqual(duplicated.get_error_count(), 1)
+        self.assertEqual(duplicated.get_dropped_count(), 1)
+        self.assertEqual(duplicated.get_error_count_by_type('undeclared_variable'), 2)
+        
+        # Without an explicit limit every issue is kept
+        unlimited = ErrorReporter()
+        for line in range(1, 1500):
+            unlimited.add_undeclared_variable_error('x', line, 1)
+        self.assertEqual(unlimited.get_error_count(), 1499)
+        self.assertEqual(unlimited.get_dropped_count(), 0)
+
+        reporter.clear()
+        self.assertEqual(reporter.get_dropped_count(), 0)
+
     def test_error_clearing(self):
         """Test clearing all errors and warnings"""
         self.error_reporter.add_undeclared_variable_error('x', 1, 5)
@@ -455,5 +657,98 @@ class TestSemanticErrorDetector(unittest.TestCase):
         self.assertEqual(self.error_reporter.get_error_count_by_type('duplicate_declaration'), 1)
 
 
+class TestAnnotatedASTExport(unittest.TestCase):
+    """Test cases for annotated AST serialization"""
+
+    def test_streamed_json_matches_dict_export(self):
+        """Test streamed JSON output is identical to dumping to_annotated_dict()"""
+        symbol_table = SymbolTable()
+        symbol_table.declare_variable('x', TIPO_INT, 1, 1)
+
+        suma = Nodo('+', '+', 2, 3)
+        suma.agregar_hijo(Nodo('ID', 'x', 2, 1))
+        suma.agregar_hijo(Nodo('NUM_FLOAT', '2.5', 2, 5))
+        root = Nodo('SENT_EXPRESION', '', 2, 1)
+        root.agregar_hijo(suma)
+        root.agregar_hijo(Nodo('ID', 'ñ', 3, 1))
+
+        annotated = ASTAnnotator(TypeSystem(), symbol_table).annotate_ast(root)
+        fragments = []
+        annotated.write_annotated_json(fragments.append)
+
+        expected = json.dumps(annotated.to_annotated_dict(), indent=2, ensure_ascii=False)
+        self.assertEqual(''.join(fragments), expected)
+
+    def test_annotated_dict_does_not_share_state(self):
+        """Test that mutating one exported dict does not leak into later exports"""
+        symbol_table = SymbolTable()
+        symbol_table.declare_variable('x', TIPO_INT, 1, 1)
+
+        asignacion = Nodo('=', '=', 2, 3)
+        asignacion.agregar_hijo(Nodo('ID', 'x', 2, 1))
+        asignacion.agregar_hijo(Nodo('NUM_INT', '5', 2, 5))
+
+        annotated = ASTAnnotator(TypeSystem(), symbol_table).annotate_ast(asignacion)
+        expected = json.loads(json.dumps(annotated.to_annotated_dict()))
+
+        exported = annotated.to_annotated_dict()
+        mutated = 0
+        pending = [exported]
+        while pending:
+            node = pending.pop()
+            attributes = node.get('semantic_attributes', {})
+            if 'type_details' in attributes:
+                attributes['type_details']['base_type'] = 'HACKED'
+                mutated += 1
+            if 'properties' in attributes:
+                attributes['properties']['is_lvalue'] = 'HACKED'
+                mutated += 1
+            pending.extend(node['hijos'])
+
+        self.assertGreater(mutated, 1)
+        self.assertEqual(annotated.to_annotated_dict(), expected)
+        self.assertEqual(TIPO_INT.base_type, 'int')
+        self.assertNotIn('HACKED', annotated.to_formatted_string())
+
+    def test_json_export_keeps_float_notation(self):
+        """Test JSON export writes floats like json.dumps whether or not orjson is installed"""
+        producto = Nodo('*', '*', 1, 5)
+        producto.agregar_hijo(Nodo('NUM_FLOAT', '10000000000000000.0', 1, 1))
+        producto.agregar_hijo(Nodo('NUM_FLOAT', '0.00001', 1, 9))
+
+        annotator = ASTAnnotator(TypeSystem(), SymbolTable())
+        annotated = annotator.annotate_ast(producto)
+        annotated.set_semantic_value(1e200)
+        annotated.annotated_children()[1].set_semantic_value(1e-05)
+
+        expected = json.dumps(annotated.to_annotated_dict(), indent=2, ensure_ascii=False)
+        exported = annotator.export_annotated_ast(annotated, 'json')
+        self.assertEqual(exported, expected)
+        self.assertIn('1e+200', exported)
+        self.assertIn('1e-05', exported)
+
+    def test_complete_json_export_matches_json_dumps(self):
+        """Test the complete JSON export streams the same text json.dumps would write"""
+        producto = Nodo('*', '*', 1, 5)
+        producto.agregar_hijo(Nodo('NUM_FLOAT', '10000000000000000.0', 1, 1))
+        producto.agregar_hijo(Nodo('NUM_FLOAT', '100.0', 1, 9))
+
+        symbol_table = SymbolTable()
+        annotated = ASTAnnotator(TypeSystem(), symbol_table).annotate_ast(producto)
+        annotated.set_semantic_value(1e18)
+
+        with tempfile.TemporaryDirectory() as directory:
+            base_filename = os.path.join(directory, 'x')
+            status = export_semantic_analysis_files(annotated, symbol_table, [], base_filename)
+            with open(base_filename + '_annotated_ast.json', encoding='utf-8') as f:
+                content = f.read()
+
+        self.assertTrue(status['annotated_ast_json'])
+        data = json.loads(content)
+        self.assertEqual(content, json.dumps(data, indent=2, ensure_ascii=False))
+        self.assertEqual(data['annotated_ast'], annotated.to_annotated_dict())
+        self.assertIn('"valor": 1e+18', content)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file